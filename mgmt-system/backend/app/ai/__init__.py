@@ -6,4 +6,6 @@ This module contains the AI-powered features for the project management system:
 - Task suggestions
 - Schedule optimization
 - Automated priority recommendations
+
+The LLM client they share is built lazily by llm.get_llm().
 """ 
\ No newline at end of file
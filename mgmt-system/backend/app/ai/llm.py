@@ -0,0 +1,52 @@
+"""
+Shared LLM client
+-----------------
+
+langchain and openai take over a second to import, so nothing here touches
+them until an AI feature first needs a model. Clients are built once per
+temperature and shared by every request and AI module.
+"""
+
+import os
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Get OpenAI API key
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+AI_FEATURES_ENABLED = os.getenv("AI_FEATURES_ENABLED", "true").lower() in ("1", "true", "yes")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_llm(temperature: float):
+    """The OpenAI LLM for `temperature`, or None if AI features are unavailable."""
+    with _clients_lock:
+        if temperature not in _clients:
+            _clients[temperature] = _create_llm(temperature)
+        return _clients[temperature]
+
+def _create_llm(temperature: float):
+    if not AI_FEATURES_ENABLED:
+        return None
+    if not OPENAI_API_KEY:
+        print("Warning: OPENAI_API_KEY not set. AI features will not work.")
+        return None
+    
+    try:
+        from langchain.llms import OpenAI
+        return OpenAI(temperature=temperature, api_key=OPENAI_API_KEY)
+    except Exception as e:
+        print(f"Error initializing OpenAI: {e}")
+        return None
+
+def run_prompt(llm, template: str, **values) -> str:
+    """Fill `template` with `values` and run it through `llm`."""
+    from langchain.chains import LLMChain
+    from langchain.prompts import PromptTemplate
+    
+    prompt = PromptTemplate(input_variables=list(values), template=template)
+    chain = LLMChain(llm=llm, prompt=prompt)
+    return chain.run(**values)
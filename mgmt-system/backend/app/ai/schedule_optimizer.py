@@ -1,29 +1,12 @@
-import os
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
-import openai
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.llms import OpenAI
-from dotenv import load_dotenv
 import json
 
 from .. import models, schemas
+from .llm import get_llm, run_prompt
 
-# Load environment variables
-load_dotenv()
-
-# Get OpenAI API key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-if not OPENAI_API_KEY:
-    print("Warning: OPENAI_API_KEY not set. AI features will not work.")
-
-# Setup LangChain
-try:
-    llm = OpenAI(temperature=0.2, api_key=OPENAI_API_KEY)
-except Exception as e:
-    print(f"Error initializing OpenAI: {e}")
-    llm = None
+# Sampling temperature for schedule optimization, kept low for stable dates
+LLM_TEMPERATURE = 0.2
 
 # Template for task scheduling
 SCHEDULE_OPTIMIZATION_TEMPLATE = """
@@ -48,7 +31,8 @@ Only modify the 'due_date' and 'priority' fields.
 def optimize_task_schedule(tasks: List[models.Task]) -> List[models.Task]:
     """Optimize the schedule of tasks using AI."""
     # If OpenAI is not available or no tasks to optimize, return the original tasks
-    if not llm or not tasks:
+    llm = get_llm(LLM_TEMPERATURE) if tasks else None
+    if not llm:
         print("Using fallback schedule optimization")
         return fallback_optimize_tasks(tasks)
     
@@ -70,17 +54,10 @@ def optimize_task_schedule(tasks: List[models.Task]) -> List[models.Task]:
             }
             tasks_data.append(task_dict)
         
-        # Create prompt
-        prompt = PromptTemplate(
-            input_variables=["tasks_json", "current_date"],
-            template=SCHEDULE_OPTIMIZATION_TEMPLATE
-        )
-        
-        # Create chain
-        chain = LLMChain(llm=llm, prompt=prompt)
-        
-        # Run chain
-        result = chain.run(
+        # Run the prompt
+        result = run_prompt(
+            llm,
+            SCHEDULE_OPTIMIZATION_TEMPLATE,
             tasks_json=json.dumps(tasks_data, indent=2),
             current_date=datetime.now().strftime("%Y-%m-%d")
         )
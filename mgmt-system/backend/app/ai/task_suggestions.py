@@ -1,28 +1,11 @@
-import os
 from typing import List
 from datetime import datetime, timedelta
-import openai
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.llms import OpenAI
-from dotenv import load_dotenv
 
 from .. import models, schemas
+from .llm import get_llm, run_prompt
 
-# Load environment variables
-load_dotenv()
-
-# Get OpenAI API key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-if not OPENAI_API_KEY:
-    print("Warning: OPENAI_API_KEY not set. AI features will not work.")
-
-# Setup LangChain
-try:
-    llm = OpenAI(temperature=0.5, api_key=OPENAI_API_KEY)
-except Exception as e:
-    print(f"Error initializing OpenAI: {e}")
-    llm = None
+# Sampling temperature for suggestions, a little creative
+LLM_TEMPERATURE = 0.5
 
 # Template for task suggestions
 TASK_SUGGESTION_TEMPLATE = """
@@ -55,6 +38,7 @@ FORMAT YOUR RESPONSE AS A JSON ARRAY WITH EACH TASK AS A JSON OBJECT.
 # Function to generate task suggestions
 def generate_task_suggestions(project: models.Project, num_suggestions: int = 3) -> List[schemas.TaskSuggestion]:
     # If OpenAI is not available, return dummy suggestions
+    llm = get_llm(LLM_TEMPERATURE)
     if not llm:
         return generate_fallback_suggestions(project, num_suggestions)
     
@@ -67,20 +51,10 @@ def generate_task_suggestions(project: models.Project, num_suggestions: int = 3)
         if not current_tasks_info:
             current_tasks_info = "No tasks created yet."
         
-        # Create prompt
-        prompt = PromptTemplate(
-            input_variables=["num_suggestions", "project_name", "project_description", 
-                            "project_category", "project_status", "project_priority",
-                            "project_start_date", "project_end_date", 
-                            "project_completion", "current_tasks"],
-            template=TASK_SUGGESTION_TEMPLATE
-        )
-        
-        # Create chain
-        chain = LLMChain(llm=llm, prompt=prompt)
-        
-        # Run chain
-        result = chain.run(
+        # Run the prompt
+        result = run_prompt(
+            llm,
+            TASK_SUGGESTION_TEMPLATE,
             num_suggestions=num_suggestions,
             project_name=project.name,
             project_description=project.description,
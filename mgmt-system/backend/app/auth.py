@@ -4,12 +4,14 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status, APIRouter
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from . import models, schemas, crud
-from .database import SessionLocal
+from .database import get_async_db
 
 # Load environment variables
 load_dotenv()
@@ -20,7 +22,24 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost than BCRYPT_ROUNDS are flagged by
+# verify_and_update and replaced on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# bcrypt runs in its own bounded pool (it releases the GIL), never on the
+# event loop, and a login storm cannot take over the threadpool that
+# serves the synchronous endpoints
+password_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS") or os.cpu_count() or 2),
+    thread_name_prefix="password-hash",
+)
 
 # OAuth2 setup
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
@@ -36,13 +55,25 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
-# Authenticate user
-def authenticate_user(db: Session, username: str, password: str):
-    user = crud.get_user_by_username(db, username)
+# Hash password in the password pool
+async def hash_password(password):
+    return await asyncio.get_running_loop().run_in_executor(password_pool, get_password_hash, password)
+
+# Authenticate user, rehashing the password if its cost is outdated
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.run_sync(crud.get_user_by_username, username)
+    # Hand the connection back to the pool before the slow password check,
+    # so logins queued for the password pool do not starve other requests
+    await db.close()
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await asyncio.get_running_loop().run_in_executor(
+        password_pool, pwd_context.verify_and_update, password, user.hashed_password
+    )
+    if not valid:
         return False
+    if new_hash:
+        await db.run_sync(crud.update_password_hash, user.id, new_hash)
     return user
 
 # Create access token
@@ -57,12 +88,17 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 # Get current user from token
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(crud.get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # Tokens verified recently resolve from the cache without a query
+    cached_user = crud.get_cached_user(token)
+    if cached_user is not None:
+        return cached_user
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -72,9 +108,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
     
-    user = crud.get_user_by_username(db, username=token_data.username)
+    generation = crud.user_generation(token_data.username)
+    user = await db.run_sync(crud.get_user_by_username, username=token_data.username)
     if user is None:
         raise credentials_exception
+    
+    # Cache a detached snapshot, safe to share between requests
+    user = schemas.User.from_orm(user)
+    crud.cache_user(token, user, generation, expires_at=payload.get("exp", 0))
     return user
 
 # Dependency to verify active user
@@ -85,8 +126,8 @@ async def get_current_active_user(current_user: models.User = Depends(get_curren
 
 # Login route for getting token
 @auth_router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(crud.get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -101,27 +142,32 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 
 # Register new user
 @auth_router.post("/register", response_model=schemas.User)
-def register_user(user: schemas.UserCreate, db: Session = Depends(crud.get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
-    if db_user:
+async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.run_sync(crud.get_users_by_email_or_username, user.email, user.username)
+    if any(db_user.email == user.email for db_user in existing):
         raise HTTPException(status_code=400, detail="Email already registered")
-    
-    db_user = crud.get_user_by_username(db, username=user.username)
-    if db_user:
+    if existing:
         raise HTTPException(status_code=400, detail="Username already taken")
     
-    return crud.create_user(db=db, user=user)
+    hashed_password = await hash_password(user.password)
+    return await db.run_sync(crud.create_user, user, hashed_password)
 
 # Get current user info
 @auth_router.get("/me", response_model=schemas.User)
 async def read_users_me(current_user: models.User = Depends(get_current_active_user)):
     return current_user
 
+# Token cache counters
+@auth_router.get("/cache-stats")
+async def read_token_cache_stats(current_user: models.User = Depends(get_current_active_user)):
+    return crud.get_token_user_cache_stats()
+
 # Update user information
 @auth_router.put("/me", response_model=schemas.User)
 async def update_user_me(
     user_update: schemas.UserUpdate,
     current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(crud.get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return crud.update_user(db=db, user_id=current_user.id, user=user_update) 
\ No newline at end of file
+    hashed_password = await hash_password(user_update.password) if user_update.password else None
+    return await db.run_sync(crud.update_user, current_user.id, user_update, hashed_password) 
\ No newline at end of file
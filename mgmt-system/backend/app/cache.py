@@ -0,0 +1,183 @@
+"""
+In-process caches
+-----------------
+
+Small thread-safe caches shared across requests within one worker process,
+and versioned caches whose backend can be shared between workers.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry when full."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """LRU cache whose entries also expire `ttl` seconds after being set."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self._clock = clock
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = super().get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires <= self._clock():
+            super().pop(key)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store `value`; `ttl` may shorten this entry's lifetime below the default."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        super().set(key, (self._clock() + ttl, value))
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = super().pop(key)
+        if entry is None or entry[0] <= self._clock():
+            return default
+        return entry[1]
+
+
+# Versioned caches
+# Entries are keyed by (scope, version, name, params). Bumping a scope's
+# version makes every entry cached under the old version unreachable, so a
+# whole scope is invalidated in O(1) and stale entries simply age out.
+# Versions start from the current time rather than 0, so a version lost to
+# eviction or a restart never resurrects entries cached under an old one.
+
+class LocalCacheBackend:
+    """Per-process backend: values in a TTL/LRU cache, versions in memory."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self._values = TTLCache(maxsize, ttl)
+        self._versions = LRUCache(maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self._values.set(key, value)
+
+    def version(self, scope: str) -> int:
+        with self._lock:
+            version = self._versions.get(scope)
+            if version is None:
+                version = time.time_ns()
+                self._versions.set(scope, version)
+            return version
+
+    def bump(self, scope: str) -> None:
+        with self._lock:
+            self._versions.set(scope, max(self._versions.get(scope, 0) + 1, time.time_ns()))
+
+
+class RedisCacheBackend:
+    """Backend shared by every worker through Redis.
+
+    Entries expire after `ttl` seconds; the LRU bound is Redis' own, set with
+    `maxmemory` and an `allkeys-lru` eviction policy.
+    """
+
+    def __init__(self, url: str, ttl: float = 60.0, prefix: str = "mgmt:cache:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(f"Cache URL '{url}' needs the redis package (pip install redis)")
+        self._redis = redis.Redis.from_url(url)
+        self._ttl = max(int(ttl), 1)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._redis.get(self._prefix + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str) -> None:
+        self._redis.set(self._prefix + key, value, ex=self._ttl)
+
+    def version(self, scope: str) -> int:
+        key = f"{self._prefix}version:{scope}"
+        self._redis.set(key, time.time_ns(), nx=True)
+        return int(self._redis.get(key) or 0)
+
+    def bump(self, scope: str) -> None:
+        self._redis.incr(f"{self._prefix}version:{scope}")
+
+
+class VersionedCache:
+    """Cache of serialized values, invalidated per scope by version bumps."""
+
+    def __init__(self, backend, namespace: str):
+        self.backend = backend
+        self.namespace = namespace
+
+    def key(self, scope: Hashable, name: str, params: Dict[str, Any]) -> str:
+        """Key of (name, params) under the current version of `scope`.
+        
+        Take the key before computing the value: a write that commits
+        meanwhile bumps the version, so a value computed from pre-commit data
+        is stored under a key that is never read again.
+        """
+        version = self.version(scope)
+        return f"{self.namespace}:{scope}:{version}:{name}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    def version(self, scope: Hashable) -> int:
+        return self.backend.version(f"{self.namespace}:{scope}")
+
+    def get(self, key: str) -> Optional[str]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.backend.set(key, value)
+
+    def invalidate(self, scope: Hashable) -> None:
+        self.backend.bump(f"{self.namespace}:{scope}")
+
+
+def make_cache_backend(url: str = "", maxsize: int = 1024, ttl: float = 60.0):
+    """In-process backend for an empty `url`, Redis for a redis:// URL."""
+    if not url:
+        return LocalCacheBackend(maxsize, ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url, ttl)
+    raise ValueError(f"Unsupported cache URL '{url}'")
@@ -1,20 +1,16 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, cast, Date
+from sqlalchemy.orm import Session, aliased, joinedload, load_only, selectinload
+from sqlalchemy import func, desc, cast, Date, select, delete, insert, update, event, case, literal, null, union_all, bindparam, distinct, or_
+from sqlalchemy.dialects import postgresql, sqlite
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterable, Tuple
 import json
+import os
+import time
 
 from . import models, schemas
-from .auth import get_password_hash
-
-# Dependency to get DB session
-def get_db():
-    from .database import SessionLocal
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+from .cache import LRUCache, TTLCache, VersionedCache, make_cache_backend
+from .pagination import keyset_page, TASK_SORT_KEYS, PROJECT_SORT_KEYS
+from .search import decode_search_cursor, search_result, search_statement, search_terms
 
 # User CRUD operations
 def get_user(db: Session, user_id: int):
@@ -26,11 +22,23 @@ def get_user_by_email(db: Session, email: str):
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
+def get_users_by_email_or_username(db: Session, email: str, username: str):
+    # Both uniqueness checks of registration in one query
+    return (
+        db.query(models.User)
+        .filter((models.User.email == email) | (models.User.username == username))
+        .limit(2)
+        .all()
+    )
+
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.User).offset(skip).limit(limit).all()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    # Callers on the event loop hash in auth's worker pool and pass the hash
+    if hashed_password is None:
+        from .auth import get_password_hash
+        hashed_password = get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         username=user.username,
@@ -42,32 +50,223 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, user: schemas.UserUpdate):
+def update_user(db: Session, user_id: int, user: schemas.UserUpdate, hashed_password: Optional[str] = None):
     db_user = get_user(db, user_id)
     
     update_data = user.dict(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        password = update_data.pop("password")
+        if hashed_password is None:
+            from .auth import get_password_hash
+            hashed_password = get_password_hash(password)
+        update_data["hashed_password"] = hashed_password
     
+    old_username = db_user.username
     for key, value in update_data.items():
         setattr(db_user, key, value)
     
     db.commit()
+    invalidate_cached_user(old_username, db_user.username)
+    analytics_cache.invalidate(USERS_SCOPE)
     db.refresh(db_user)
     return db_user
 
+def update_password_hash(db: Session, user_id: int, hashed_password: str):
+    # Rehash on login; the password itself is unchanged, so cached tokens stay valid
+    db.execute(update(models.User).where(models.User.id == user_id).values(hashed_password=hashed_password))
+    db.commit()
+
 def delete_user(db: Session, user_id: int):
     db_user = get_user(db, user_id)
     db.delete(db_user)
     db.commit()
+    invalidate_cached_user(db_user.username)
+    analytics_cache.invalidate(USERS_SCOPE)
     return db_user
 
+# Authenticated user cache
+# Verified token -> user snapshot, so steady-state authentication costs no
+# queries. Each entry remembers the user's generation when it was loaded;
+# update_user and delete_user bump the generation after committing, which
+# turns every cached token of that user into a miss. Entries never outlive
+# their token. The cache is per process, so a change made through another
+# worker is seen there once AUTH_CACHE_TTL has passed.
+token_user_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL", "60")),
+)
+token_user_stats = {"hits": 0, "misses": 0}
+_user_generations: Dict[str, int] = {}
+
+def user_generation(username: str) -> int:
+    return _user_generations.get(username, 0)
+
+def invalidate_cached_user(*usernames: str):
+    for username in usernames:
+        _user_generations[username] = _user_generations.get(username, 0) + 1
+
+def get_cached_user(token: str) -> Optional[schemas.User]:
+    entry = token_user_cache.get(token)
+    if entry is not None:
+        generation, user = entry
+        if generation == user_generation(user.username):
+            token_user_stats["hits"] += 1
+            return user
+        token_user_cache.pop(token)
+    token_user_stats["misses"] += 1
+    return None
+
+def cache_user(token: str, user: schemas.User, generation: int, expires_at: float):
+    """Cache `user` for `token` until the token expires (`expires_at`, epoch seconds).
+    
+    `generation` must be read with user_generation() before the user was
+    loaded, so a concurrent update is never cached as current.
+    """
+    ttl = expires_at - time.time()
+    if ttl > 0:
+        token_user_cache.set(token, (generation, user), ttl=ttl)
+
+def get_token_user_cache_stats() -> Dict[str, int]:
+    return {**token_user_stats, "size": len(token_user_cache), "maxsize": token_user_cache.maxsize}
+
+# Loader strategies matched to the nested response schemas.
+# Many-to-one relations are joined into the parent SELECT and each collection
+# is fetched with a single "WHERE parent_id IN (...)" query, so the number of
+# queries per read is fixed no matter how many rows come back.
+TASK_RELATION_OPTIONS = {
+    "assignee": joinedload(models.Task.assignee),
+    "tags": selectinload(models.Task.tags),
+    "attachments": selectinload(models.Task.attachments),
+    "comments": selectinload(models.Task.comments).joinedload(models.Comment.user),
+}
+TASK_LOAD_OPTIONS = tuple(TASK_RELATION_OPTIONS.values())
+
+PROJECT_RELATION_OPTIONS = {
+    "owner": joinedload(models.Project.owner),
+    "team": selectinload(models.Project.team),
+    "tasks": selectinload(models.Project.tasks).options(*TASK_LOAD_OPTIONS),
+}
+PROJECT_LOAD_OPTIONS = tuple(PROJECT_RELATION_OPTIONS.values())
+
+# Loader options for a sparse fieldset (see serializers.Fieldset): only its
+# columns, plus `extra_fields` (sort keys), and only its relations are loaded
+def fieldset_load_options(model, relation_options: dict, fieldset=None, extra_fields: Iterable[str] = ()):
+    if fieldset is None:
+        return tuple(relation_options.values())
+    columns = [getattr(model, name) for name in dict.fromkeys([*fieldset.fields, *extra_fields])]
+    return (load_only(*columns), *(relation_options[name] for name in fieldset.include))
+
+def task_load_options(fieldset=None, sort: Optional[str] = None):
+    return fieldset_load_options(models.Task, TASK_RELATION_OPTIONS, fieldset, _sort_fields(sort, TASK_SORT_KEYS))
+
+def project_load_options(fieldset=None, sort: Optional[str] = None):
+    return fieldset_load_options(models.Project, PROJECT_RELATION_OPTIONS, fieldset, _sort_fields(sort, PROJECT_SORT_KEYS))
+
+def _sort_fields(sort: Optional[str], sort_keys: dict):
+    # next_cursor() reads the sort key off the last row, so it must be loaded
+    key = (sort or "id").lstrip("-")
+    return (key,) if key in sort_keys else ()
+
+# Analytics response cache
+# Analytics responses are cached per user under a data version that every
+# project or task write bumps. Like tag ids, the bump is staged on the
+# session and only applied once the write commits.
+analytics_cache = VersionedCache(
+    make_cache_backend(
+        os.getenv("ANALYTICS_CACHE_URL", ""),
+        maxsize=int(os.getenv("ANALYTICS_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("ANALYTICS_CACHE_TTL", "60")),
+    ),
+    namespace="analytics",
+)
+
+# Scope bumped when any user's profile changes: users are embedded in other
+# users' project and task responses
+USERS_SCOPE = "users"
+
+def user_data_version(user_id: int) -> str:
+    """Changes whenever the user's projects or tasks, or any profile, change."""
+    return f"{analytics_cache.version(user_id)}.{analytics_cache.version(USERS_SCOPE)}"
+
+def mark_user_data_changed(db: Session, user_id: Optional[int]):
+    if user_id is not None:
+        db.info.setdefault("changed_users", set()).add(user_id)
+
+def _mark_projects_changed(db: Session, project_ids: Iterable[Optional[int]]):
+    # The projects are normally in the identity map already from the
+    # ownership check, so this rarely costs a query
+    for project_id in set(project_ids):
+        project = db.get(models.Project, project_id) if project_id is not None else None
+        if project is not None:
+            mark_user_data_changed(db, project.user_id)
+
+@event.listens_for(Session, "after_commit")
+def _bump_user_data_versions(session):
+    for user_id in session.info.pop("changed_users", ()):
+        analytics_cache.invalidate(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_data_changes(session):
+    session.info.pop("changed_users", None)
+
 # Project CRUD operations
 def get_project(db: Session, project_id: int):
-    return db.query(models.Project).filter(models.Project.id == project_id).first()
+    return (
+        db.query(models.Project)
+        .options(*PROJECT_LOAD_OPTIONS)
+        .filter(models.Project.id == project_id)
+        .first()
+    )
+
+# Ownership-scoped loaders: fetch and authorize in one query, returning None
+# both for missing rows and for rows the user does not own
+def get_project_for_user(db: Session, project_id: int, user_id: int, options=PROJECT_LOAD_OPTIONS):
+    return (
+        db.query(models.Project)
+        .options(*options)
+        .filter(models.Project.id == project_id, models.Project.user_id == user_id)
+        .first()
+    )
+
+def user_owns_project(db: Session, project_id: int, user_id: int) -> bool:
+    return db.query(
+        select(models.Project.id)
+        .where(models.Project.id == project_id, models.Project.user_id == user_id)
+        .exists()
+    ).scalar()
+
+def get_projects(db: Session, user_id: int, skip: int = 0, limit: int = 100,
+                 sort: Optional[str] = None, cursor: Optional[str] = None, fieldset=None):
+    query = (
+        db.query(models.Project)
+        .options(*project_load_options(fieldset, sort))
+        .filter(models.Project.user_id == user_id)
+    )
+    
+    # Order by (sort key, id) and seek past the cursor if given
+    return keyset_page(
+        db, query, PROJECT_SORT_KEYS, models.Project.id,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
 
-def get_projects(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).filter(models.Project.user_id == user_id).offset(skip).limit(limit).all()
+def get_project_summaries(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    # Select only the columns of schemas.ProjectSummary as plain rows,
+    # bypassing the ORM identity map and relationship loading entirely
+    stmt = (
+        select(
+            models.Project.id,
+            models.Project.name,
+            models.Project.status,
+            models.Project.completion_percentage,
+            models.Project.end_date,
+            models.Project.priority,
+        )
+        .where(models.Project.user_id == user_id)
+        .order_by(models.Project.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).all()
 
 def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
     db_project = models.Project(
@@ -75,6 +274,7 @@ def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
         user_id=user_id
     )
     db.add(db_project)
+    mark_user_data_changed(db, user_id)
     db.commit()
     db.refresh(db_project)
     
@@ -87,12 +287,17 @@ def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
                 db_project.team.append(user)
         
         db.commit()
-        db.refresh(db_project)
     
-    return db_project
+    return get_project(db, db_project.id)
 
-def update_project(db: Session, project_id: int, project: schemas.ProjectUpdate):
-    db_project = get_project(db, project_id)
+def update_project(db: Session, project_id: int, project: schemas.ProjectUpdate, user_id: Optional[int] = None):
+    # The response is reloaded below, so nothing is eager-loaded here
+    db_project = (
+        get_project_for_user(db, project_id, user_id, options=())
+        if user_id is not None else get_project(db, project_id)
+    )
+    if db_project is None:
+        return None
     
     # Update basic fields
     update_data = project.dict(exclude={"team"}, exclude_unset=True)
@@ -101,8 +306,9 @@ def update_project(db: Session, project_id: int, project: schemas.ProjectUpdate)
     
     # Update team members if provided
     if project.team is not None:
-        # Clear existing team members
+        # Clear existing team members, stamping the project like a field change
         db_project.team = []
+        db_project.updated_at = func.now()
         
         # Add new team members
         for member_id in project.team:
@@ -110,98 +316,433 @@ def update_project(db: Session, project_id: int, project: schemas.ProjectUpdate)
             if user:
                 db_project.team.append(user)
     
+    mark_user_data_changed(db, db_project.user_id)
     db.commit()
-    db.refresh(db_project)
-    return db_project
+    return get_project(db, db_project.id)
 
-def delete_project(db: Session, project_id: int):
-    db_project = get_project(db, project_id)
+def delete_project(db: Session, project_id: int, user_id: Optional[int] = None):
+    db_project = (
+        get_project_for_user(db, project_id, user_id)
+        if user_id is not None else get_project(db, project_id)
+    )
+    if db_project is None:
+        return None
+    db.execute(delete(models.TaskCompletionDaily).where(models.TaskCompletionDaily.project_id == project_id))
     db.delete(db_project)
+    mark_user_data_changed(db, db_project.user_id)
     db.commit()
     return db_project
 
+# Tag resolution
+# Tag name -> id cache shared across requests. Ids seen by a transaction are
+# only published to it once that transaction commits, so a rolled back tag
+# insert never leaves a dangling id behind.
+tag_id_cache = LRUCache(maxsize=int(os.getenv("TAG_CACHE_SIZE", "10000")))
+
+@event.listens_for(Session, "after_commit")
+def _publish_tag_ids(session):
+    for name, tag_id in session.info.pop("tag_ids", {}).items():
+        tag_id_cache.set(name, tag_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_tag_ids(session):
+    session.info.pop("tag_ids", None)
+
+def _dialect_insert(db: Session, table):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+def resolve_tag_ids(db: Session, names: Iterable[str]) -> List[int]:
+    """Return tag ids for `names` (in order, deduplicated), creating missing tags.
+
+    Costs no queries when every name is cached, otherwise one IN (...) lookup
+    plus, for names that do not exist yet, one multi-row INSERT ... ON
+    CONFLICT DO NOTHING RETURNING.
+    """
+    names = list(dict.fromkeys(names))
+    pending = db.info.setdefault("tag_ids", {})
+    
+    ids = {}
+    for name in names:
+        tag_id = pending.get(name) or tag_id_cache.get(name)
+        if tag_id is not None:
+            ids[name] = tag_id
+    
+    missing = [name for name in names if name not in ids]
+    if missing:
+        rows = db.execute(select(models.Tag.name, models.Tag.id).where(models.Tag.name.in_(missing)))
+        ids.update(rows.all())
+        
+        new = [name for name in missing if name not in ids]
+        if new:
+            stmt = (
+                _dialect_insert(db, models.Tag)
+                .values([{"name": name} for name in new])
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(models.Tag.name, models.Tag.id)
+            )
+            ids.update(db.execute(stmt).all())
+            
+            # Tags created concurrently by another transaction were skipped
+            raced = [name for name in new if name not in ids]
+            if raced:
+                rows = db.execute(select(models.Tag.name, models.Tag.id).where(models.Tag.name.in_(raced)))
+                ids.update(rows.all())
+        
+        pending.update((name, ids[name]) for name in missing)
+    
+    return [ids[name] for name in names]
+
+def set_task_tags(db: Session, task_id: int, names: Iterable[str], replace: bool = True):
+    # Write the association rows directly instead of loading Tag objects
+    # into the relationship collection
+    tag_ids = resolve_tag_ids(db, names)
+    if replace:
+        db.execute(delete(models.task_tags).where(models.task_tags.c.task_id == task_id))
+        _touch_tasks(db, [task_id])
+    if tag_ids:
+        db.execute(
+            insert(models.task_tags),
+            [{"task_id": task_id, "tag_id": tag_id} for tag_id in tag_ids]
+        )
+
+# Association rows do not stamp their parent, so retagging a task updates
+# its updated_at explicitly (conditional GETs rely on it, see task_fingerprint)
+def _touch_tasks(db: Session, task_ids: List[int]):
+    db.execute(
+        update(models.Task).where(models.Task.id.in_(task_ids)).values(updated_at=func.now()),
+        execution_options={"synchronize_session": False},
+    )
+
+# Project counters and the completion rollup are adjusted by deltas computed
+# from a task's state as read before the write, so no other transaction may
+# change that state until this one commits. PostgreSQL locks the task rows;
+# SQLite has no row locks, so the transaction takes the database write lock
+# before its first read (pysqlite would otherwise run the read outside of
+# any transaction). Call this before reading the tasks.
+def _lock_tasks(db: Session, task_ids: Iterable[int]):
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        return
+    # In id order, so concurrent batches cannot deadlock on each other
+    db.execute(
+        select(models.Task.id)
+        .where(models.Task.id.in_(list(task_ids)))
+        .order_by(models.Task.id)
+        .with_for_update()
+    )
+
 # Task CRUD operations
 def get_task(db: Session, task_id: int):
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
+    return (
+        db.query(models.Task)
+        .options(*TASK_LOAD_OPTIONS)
+        .filter(models.Task.id == task_id)
+        .first()
+    )
 
-def get_tasks(db: Session, user_id: int, project_id: Optional[int] = None, 
-              status: Optional[str] = None, skip: int = 0, limit: int = 100):
+def get_tasks_by_ids(db: Session, task_ids: List[int]):
+    # In the order of task_ids; ids of tasks that no longer exist are skipped
+    tasks = {
+        task.id: task
+        for task in db.query(models.Task).options(*TASK_LOAD_OPTIONS).filter(models.Task.id.in_(task_ids))
+    }
+    return [tasks[task_id] for task_id in task_ids if task_id in tasks]
+
+def get_task_for_user(db: Session, task_id: int, user_id: int, options=TASK_LOAD_OPTIONS):
+    return (
+        db.query(models.Task)
+        .options(*options)
+        .join(models.Project, models.Task.project_id == models.Project.id)
+        .filter(models.Task.id == task_id, models.Project.user_id == user_id)
+        .first()
+    )
+
+# Task list filters
+# The filters of the task list routes, as conditions ANDed into their one
+# statement. `status` and `priority` take a value or a list of values; tasks
+# match `tags` if they have any of them and `tags_all` if they have all of
+# them; due dates are bounded by [due_from, due_before). The (project_id,
+# due_date) and (assignee_id, due_date) indexes serve the date ranges.
+def _tagged_task_ids(names: List[str]):
+    return (
+        select(models.task_tags.c.task_id)
+        .join(models.Tag, models.Tag.id == models.task_tags.c.tag_id)
+        .where(models.Tag.name.in_(names))
+    )
+
+def _matches(column, value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return column.in_(value)
+    return column == value
+
+def task_filter_conditions(project_id: Optional[int] = None, status=None, priority=None,
+                           assignee_id: Optional[int] = None, due_from: Optional[datetime] = None,
+                           due_before: Optional[datetime] = None, tags: Optional[List[str]] = None,
+                           tags_all: Optional[List[str]] = None) -> list:
+    conditions = []
+    if project_id is not None:
+        conditions.append(models.Task.project_id == project_id)
+    if status is not None:
+        conditions.append(_matches(models.Task.status, status))
+    if priority is not None:
+        conditions.append(_matches(models.Task.priority, priority))
+    if assignee_id is not None:
+        conditions.append(models.Task.assignee_id == assignee_id)
+    if due_from is not None:
+        conditions.append(models.Task.due_date >= due_from)
+    if due_before is not None:
+        conditions.append(models.Task.due_date < due_before)
+    if tags:
+        conditions.append(models.Task.id.in_(_tagged_task_ids(tags)))
+    if tags_all:
+        # Tag names are unique and (task_id, tag_id) is the key of task_tags,
+        # so a task has all the tags when it matches as many rows as names
+        names = set(tags_all)
+        conditions.append(models.Task.id.in_(
+            _tagged_task_ids(names).group_by(models.task_tags.c.task_id).having(func.count() == len(names))
+        ))
+    return conditions
+
+def get_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 100,
+              sort: Optional[str] = None, cursor: Optional[str] = None, fieldset=None, **filters):
     # Get projects owned by user
     user_projects = db.query(models.Project.id).filter(models.Project.user_id == user_id)
     
-    # Base query for tasks in user's projects
-    query = db.query(models.Task).filter(models.Task.project_id.in_(user_projects))
+    # Base query for tasks in user's projects, loading only what `fieldset` needs
+    query = (
+        db.query(models.Task)
+        .options(*task_load_options(fieldset, sort))
+        .filter(models.Task.project_id.in_(user_projects))
+    )
     
-    # Apply filters if provided
-    if project_id is not None:
-        query = query.filter(models.Task.project_id == project_id)
+    # Apply filters if provided (see task_filter_conditions)
+    query = query.filter(*task_filter_conditions(**filters))
     
-    if status is not None:
-        query = query.filter(models.Task.status == status)
-    
-    # Apply pagination
-    return query.offset(skip).limit(limit).all()
-
-def create_task(db: Session, task: schemas.TaskCreate):
-    # Handle tags
-    tag_objects = []
-    for tag_name in task.tags:
-        # Check if tag exists
-        tag = db.query(models.Tag).filter(models.Tag.name == tag_name).first()
-        if not tag:
-            # Create new tag
-            tag = models.Tag(name=tag_name)
-            db.add(tag)
-            db.flush()
-        
-        tag_objects.append(tag)
+    # Order by (sort key, id) and seek past the cursor if given
+    return keyset_page(
+        db, query, TASK_SORT_KEYS, models.Task.id,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def get_task_summaries(db: Session, user_id: int, skip: int = 0, limit: int = 100, **filters):
+    # Select only the columns of schemas.TaskSummary as plain rows,
+    # bypassing the ORM identity map and relationship loading entirely
+    user_projects = select(models.Project.id).where(models.Project.user_id == user_id)
+    
+    stmt = (
+        select(
+            models.Task.id,
+            models.Task.title,
+            models.Task.status,
+            models.Task.priority,
+            models.Task.due_date,
+        )
+        .where(models.Task.project_id.in_(user_projects))
+    )
+    
+    # Apply filters if provided (see task_filter_conditions)
+    stmt = stmt.where(*task_filter_conditions(**filters))
+    
+    stmt = stmt.order_by(models.Task.id).offset(skip).limit(limit)
+    return db.execute(stmt).all()
+
+# Exports
+# Flat rows for the streaming exports: plain column selects, with the
+# assignee joined in and tag / team names aggregated per row by a correlated
+# subquery, so rows can be streamed straight off a server-side cursor
+# Tasks are left unordered (they come out grouped by project): sorting them
+# would have the database buffer the whole export before the first row
+EXPORT_LIST_SEPARATOR = "\x1f"
+
+def _name_list(column, dialect: str):
+    if dialect == "postgresql":
+        return func.string_agg(column, EXPORT_LIST_SEPARATOR)
+    return func.group_concat(column, EXPORT_LIST_SEPARATOR)
+
+def task_export_statement(user_id: int, dialect: str):
+    assignee = aliased(models.User)
+    tags = (
+        select(_name_list(models.Tag.name, dialect))
+        .select_from(models.task_tags.join(models.Tag, models.Tag.id == models.task_tags.c.tag_id))
+        .where(models.task_tags.c.task_id == models.Task.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            models.Task.id,
+            models.Task.project_id,
+            models.Project.name.label("project_name"),
+            models.Task.title,
+            models.Task.description,
+            models.Task.status,
+            models.Task.priority,
+            models.Task.due_date,
+            models.Task.estimated_hours,
+            models.Task.actual_hours,
+            models.Task.completed_at,
+            models.Task.created_at,
+            models.Task.updated_at,
+            models.Task.assignee_id,
+            assignee.username.label("assignee_username"),
+            assignee.email.label("assignee_email"),
+            tags.label("tags"),
+        )
+        .join(models.Project, models.Task.project_id == models.Project.id)
+        .outerjoin(assignee, models.Task.assignee_id == assignee.id)
+        .where(models.Project.user_id == user_id)
+    )
+
+def project_export_statement(user_id: int, dialect: str):
+    team = (
+        select(_name_list(models.User.username, dialect))
+        .select_from(models.project_team_members.join(
+            models.User, models.User.id == models.project_team_members.c.user_id
+        ))
+        .where(models.project_team_members.c.project_id == models.Project.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            models.Project.id,
+            models.Project.name,
+            models.Project.description,
+            models.Project.category,
+            models.Project.status,
+            models.Project.priority,
+            models.Project.start_date,
+            models.Project.end_date,
+            models.Project.budget,
+            models.Project.expenses,
+            models.Project.completion_percentage,
+            models.Project.total_tasks,
+            models.Project.done_tasks,
+            models.Project.created_at,
+            models.Project.updated_at,
+            team.label("team"),
+        )
+        .where(models.Project.user_id == user_id)
+        .order_by(models.Project.id)
+    )
+
+# Search
+# Ranked tasks, projects and comments of the user's projects matching every
+# word of `q` (see search.py); `cursor` continues after a previous page
+def search_documents(db: Session, user_id: int, q: str, limit: int = 20, cursor: Optional[str] = None) -> List[dict]:
+    terms = search_terms(q)
+    if not terms:
+        return []
+    after = decode_search_cursor(cursor) if cursor else None
+
+    stmt = search_statement(db.get_bind().dialect.name, user_id, terms, limit, after)
+    return [search_result(row) for row in db.execute(stmt)]
+
+# Row fingerprints for conditional GETs: row count, highest id and latest
+# change of the rows a response is built from. An insert, delete or update
+# moves at least one of them, and they come from a single aggregate query.
+def _fingerprint_columns(model):
+    return (
+        func.count(distinct(model.id)),
+        func.max(model.id),
+        func.max(func.coalesce(model.updated_at, model.created_at)),
+    )
+
+def task_fingerprint(db: Session, user_id: int, task_id: Optional[int] = None, **filters) -> tuple:
+    stmt = (
+        select(*_fingerprint_columns(models.Task))
+        .join(models.Project, models.Task.project_id == models.Project.id)
+        .where(models.Project.user_id == user_id, *task_filter_conditions(**filters))
+    )
+    if task_id is not None:
+        stmt = stmt.where(models.Task.id == task_id)
+    return tuple(db.execute(stmt).one())
+
+def project_fingerprint(db: Session, user_id: int, project_id: Optional[int] = None) -> tuple:
+    # Projects embed their tasks, so both are covered
+    stmt = (
+        select(*_fingerprint_columns(models.Project), *_fingerprint_columns(models.Task))
+        .select_from(models.Project)
+        .outerjoin(models.Task, models.Task.project_id == models.Project.id)
+        .where(models.Project.user_id == user_id)
+    )
+    if project_id is not None:
+        stmt = stmt.where(models.Project.id == project_id)
+    return tuple(db.execute(stmt).one())
+
+def create_task(db: Session, task: schemas.TaskCreate, user_id: Optional[int] = None):
+    # With a user_id, the task's project must belong to that user
+    if user_id is not None and not user_owns_project(db, task.project_id, user_id):
+        return None
     
     # Create task
     db_task = models.Task(
         **task.dict(exclude={"tags"}),
     )
+    if db_task.status == models.TaskStatus.DONE:
+        db_task.completed_at = datetime.now()
     db.add(db_task)
     db.flush()
     
     # Associate tags with task
-    db_task.tags = tag_objects
+    set_task_tags(db, db_task.id, task.tags, replace=False)
+    
+    # Count the task on its project and in the completion rollup
+    deltas, completions = {}, {}
+    count_task_change(deltas, new=(db_task.project_id, db_task.status))
+    count_task_completion(completions, new=_completion_state(db_task))
+    adjust_project_counters(db, deltas)
+    adjust_completion_rollup(db, completions)
+    _mark_projects_changed(db, [db_task.project_id])
     
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    return get_task(db, db_task.id)
 
-def update_task(db: Session, task_id: int, task: schemas.TaskUpdate):
-    db_task = get_task(db, task_id)
+def update_task(db: Session, task_id: int, task: schemas.TaskUpdate, user_id: Optional[int] = None):
+    # The response is reloaded below, so nothing is eager-loaded here
+    _lock_tasks(db, [task_id])
+    db_task = (
+        get_task_for_user(db, task_id, user_id, options=())
+        if user_id is not None else get_task(db, task_id)
+    )
+    if db_task is None:
+        return None
     
-    # Handle tags if provided
+    # Replace tags if provided
     if task.tags is not None:
-        # Clear existing tags
-        db_task.tags = []
-        
-        # Add new tags
-        for tag_name in task.tags:
-            # Check if tag exists
-            tag = db.query(models.Tag).filter(models.Tag.name == tag_name).first()
-            if not tag:
-                # Create new tag
-                tag = models.Tag(name=tag_name)
-                db.add(tag)
-                db.flush()
-            
-            db_task.tags.append(tag)
+        set_task_tags(db, task_id, task.tags)
     
     # Update other fields
+    old_state = (db_task.project_id, db_task.status)
+    old_completion = _completion_state(db_task)
     update_data = task.dict(exclude={"tags"}, exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_task, key, value)
     
+    # Stamp the completion time on transitions to and from DONE
+    if db_task.status == models.TaskStatus.DONE:
+        if old_state[1] != models.TaskStatus.DONE:
+            db_task.completed_at = datetime.now()
+    else:
+        db_task.completed_at = None
+    
+    # Move the task between project counters and completion rollup buckets
+    # if its status, project or priority changed
+    deltas, completions = {}, {}
+    count_task_change(deltas, old=old_state, new=(db_task.project_id, db_task.status))
+    count_task_completion(completions, old=old_completion, new=_completion_state(db_task))
+    adjust_project_counters(db, deltas)
+    adjust_completion_rollup(db, completions)
+    _mark_projects_changed(db, [old_state[0], db_task.project_id])
+    
     # If status is changed to "done", record completion time
-    if task.status == models.TaskStatus.DONE and db_task.status != models.TaskStatus.DONE:
+    if task.status == models.TaskStatus.DONE and old_state[1] != models.TaskStatus.DONE:
         # Create a log entry
         log_entry = models.Log(
             event_type="task_completed",
             description=f"Task '{db_task.title}' marked as done",
-            metadata=json.dumps({
+            event_metadata=json.dumps({
                 "task_id": db_task.id,
                 "project_id": db_task.project_id,
                 "time_taken": str(datetime.now() - db_task.created_at),
@@ -211,74 +752,636 @@ def update_task(db: Session, task_id: int, task: schemas.TaskUpdate):
             user_id=db_task.assignee_id
         )
         db.add(log_entry)
-        
-        # Update project completion percentage
-        update_project_completion(db, db_task.project_id)
     
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    return get_task(db, db_task.id)
 
-def delete_task(db: Session, task_id: int):
-    db_task = get_task(db, task_id)
-    project_id = db_task.project_id
+def delete_task(db: Session, task_id: int, user_id: Optional[int] = None):
+    _lock_tasks(db, [task_id])
+    db_task = (
+        get_task_for_user(db, task_id, user_id)
+        if user_id is not None else get_task(db, task_id)
+    )
+    if db_task is None:
+        return None
     db.delete(db_task)
-    db.commit()
     
-    # Update project completion percentage
-    update_project_completion(db, project_id)
+    # Remove the task from its project counters and the completion rollup
+    # in the same transaction
+    deltas, completions = {}, {}
+    count_task_change(deltas, old=(db_task.project_id, db_task.status))
+    count_task_completion(completions, old=_completion_state(db_task))
+    adjust_project_counters(db, deltas)
+    adjust_completion_rollup(db, completions)
+    _mark_projects_changed(db, [db_task.project_id])
     
+    db.commit()
     return db_task
 
-# Helper function to update project completion percentage
-def update_project_completion(db: Session, project_id: int):
-    project = get_project(db, project_id)
-    if not project:
+# Batch task operations
+def _completion_log(task_id: int, title: str, project_id: int, assignee_id: Optional[int],
+                    created_at: Optional[datetime]) -> dict:
+    return {
+        "event_type": "task_completed",
+        "description": f"Task '{title}' marked as done",
+        "event_metadata": json.dumps({
+            "task_id": task_id,
+            "project_id": project_id,
+            "time_taken": str(datetime.now() - created_at) if created_at else None,
+        }),
+        "task_id": task_id,
+        "project_id": project_id,
+        "user_id": assignee_id,
+    }
+
+def _insert_tasks(db: Session, items: List[dict], now: datetime, deltas: Dict[int, tuple],
+                  completions: Dict[tuple, int], completion_logs: List[dict]) -> List[int]:
+    """Insert new tasks, given as dicts of TaskCreate fields, and their tags.
+    
+    Returns the new ids in the order of `items` and records the counter,
+    rollup and completion log changes in `deltas`, `completions` and
+    `completion_logs` for the caller to apply.
+    """
+    done = models.TaskStatus.DONE
+    rows = [
+        {
+            **{name: value for name, value in item.items() if name != "tags"},
+            "completed_at": now if item["status"] == done else None,
+        }
+        for item in items
+    ]
+    # Autoincrement ids are handed out in VALUES order, so the sorted
+    # RETURNING ids line up with the parameter rows. Asking SQLAlchemy
+    # to sort them instead degrades to one INSERT per row on SQLite.
+    # The insert targets the table, not the entity: the ORM bulk path
+    # splits the rows into a statement per run of identical None
+    # columns (completed_at is set on DONE rows only).
+    tasks = models.Task.__table__
+    new_ids = sorted(db.scalars(insert(tasks).returning(tasks.c.id), rows).all())
+    
+    names = list(dict.fromkeys(tag for item in items for tag in item["tags"]))
+    tag_ids = dict(zip(names, resolve_tag_ids(db, names)))
+    
+    tag_rows = []
+    for item, row, task_id in zip(items, rows, new_ids):
+        tag_rows.extend({"task_id": task_id, "tag_id": tag_ids[name]} for name in dict.fromkeys(item["tags"]))
+        if item["status"] == done:
+            completion_logs.append(_completion_log(task_id, item["title"], item["project_id"], item["assignee_id"], None))
+        count_task_change(deltas, new=(item["project_id"], item["status"]))
+        count_task_completion(completions, new=(item["project_id"], item["status"], item["priority"], row["completed_at"]))
+    if tag_rows:
+        db.execute(insert(models.task_tags), tag_rows)
+    return new_ids
+
+def apply_task_batch(db: Session, user_id: int, batch: schemas.TaskBatch) -> schemas.TaskBatchResult:
+    """Apply many task creates, updates and deletes in a single transaction.
+    
+    Ownership of every referenced task and project is checked with one
+    query, creates are a single INSERT ... RETURNING, updates a single
+    executemany, and project counters are adjusted once per affected
+    project. Items that fail the ownership check are reported and skipped.
+    """
+    results = []
+    
+    # One ownership query for every task and project the batch touches
+    task_ids = {item.id for item in batch.update} | set(batch.delete)
+    project_ids = {item.project_id for item in batch.create} | {
+        item.project_id for item in batch.update if item.project_id is not None
+    }
+    owned_tasks, owned_projects = {}, set()
+    if task_ids:
+        _lock_tasks(db, task_ids)
+    if task_ids or project_ids:
+        owned = union_all(
+            select(
+                literal("task").label("kind"), models.Task.id, models.Task.project_id,
+                models.Task.status, models.Task.title, models.Task.assignee_id, models.Task.created_at,
+                models.Task.priority, models.Task.completed_at,
+            )
+            .join(models.Project, models.Project.id == models.Task.project_id)
+            .where(models.Task.id.in_(task_ids), models.Project.user_id == user_id),
+            select(
+                literal("project"), models.Project.id, models.Project.id,
+                null(), null(), null(), null(), null(), null(),
+            )
+            .where(models.Project.id.in_(project_ids), models.Project.user_id == user_id),
+        )
+        for row in db.execute(owned):
+            if row.kind == "task":
+                owned_tasks[row.id] = row
+            else:
+                owned_projects.add(row.id)
+    
+    deltas, completions = {}, {}
+    completion_logs = []
+    now = datetime.now()
+    
+    # Creates
+    creates = []
+    for index, item in enumerate(batch.create):
+        if item.project_id in owned_projects:
+            creates.append((index, item))
+        else:
+            results.append(schemas.TaskBatchItemResult(op="create", index=index, ok=False, error="Project not found"))
+    
+    if creates:
+        new_ids = _insert_tasks(db, [dict(item) for _, item in creates], now, deltas, completions, completion_logs)
+        results.extend(
+            schemas.TaskBatchItemResult(op="create", index=index, id=task_id)
+            for (index, _), task_id in zip(creates, new_ids)
+        )
+    
+    # Updates
+    updates = []
+    for index, item in enumerate(batch.update):
+        task = owned_tasks.get(item.id)
+        if task is None:
+            results.append(schemas.TaskBatchItemResult(op="update", index=index, id=item.id, ok=False, error="Task not found"))
+        elif item.project_id is not None and item.project_id not in owned_projects:
+            results.append(schemas.TaskBatchItemResult(op="update", index=index, id=item.id, ok=False, error="Project not found"))
+        else:
+            updates.append((index, item, task))
+    
+    if updates:
+        rows = []
+        for _, item, task in updates:
+            row = {"id": item.id, **item.dict(exclude={"id", "tags"}, exclude_unset=True)}
+            # Stamp the completion time on transitions to and from DONE
+            if "status" in row:
+                if row["status"] != models.TaskStatus.DONE:
+                    row["completed_at"] = None
+                elif task.status != models.TaskStatus.DONE:
+                    row["completed_at"] = now
+            rows.append(row)
+        changed = [row for row in rows if len(row) > 1]
+        if changed:
+            db.execute(update(models.Task), changed)
+        
+        retagged = [item for _, item, _ in updates if item.tags is not None]
+        if retagged:
+            names = list(dict.fromkeys(tag for item in retagged for tag in item.tags))
+            tag_ids = dict(zip(names, resolve_tag_ids(db, names)))
+            db.execute(delete(models.task_tags).where(models.task_tags.c.task_id.in_([item.id for item in retagged])))
+            _touch_tasks(db, [item.id for item in retagged])
+            tag_rows = [
+                {"task_id": item.id, "tag_id": tag_ids[name]}
+                for item in retagged for name in dict.fromkeys(item.tags)
+            ]
+            if tag_rows:
+                db.execute(insert(models.task_tags), tag_rows)
+        
+        for (index, item, task), row in zip(updates, rows):
+            new_project_id = item.project_id if item.project_id is not None else task.project_id
+            new_status = item.status if item.status is not None else task.status
+            new_priority = item.priority if item.priority is not None else task.priority
+            count_task_change(deltas, old=(task.project_id, task.status), new=(new_project_id, new_status))
+            count_task_completion(
+                completions,
+                old=_completion_state(task),
+                new=(new_project_id, new_status, new_priority, row.get("completed_at", task.completed_at)),
+            )
+            if item.status == models.TaskStatus.DONE and task.status != models.TaskStatus.DONE:
+                completion_logs.append(_completion_log(
+                    item.id, item.title or task.title, new_project_id,
+                    item.assignee_id if "assignee_id" in item.__fields_set__ else task.assignee_id,
+                    task.created_at,
+                ))
+            results.append(schemas.TaskBatchItemResult(op="update", index=index, id=item.id))
+    
+    # Deletes
+    deletes = []
+    for index, task_id in enumerate(batch.delete):
+        task = owned_tasks.get(task_id)
+        if task is None:
+            results.append(schemas.TaskBatchItemResult(op="delete", index=index, id=task_id, ok=False, error="Task not found"))
+        else:
+            deletes.append(task_id)
+            count_task_change(deltas, old=(task.project_id, task.status))
+            count_task_completion(completions, old=_completion_state(task))
+            results.append(schemas.TaskBatchItemResult(op="delete", index=index, id=task_id))
+    
+    if deletes:
+        # Children first, mirroring the ORM cascades on Task
+        for table in (models.task_tags, models.Comment.__table__, models.Attachment.__table__):
+            db.execute(delete(table).where(table.c.task_id.in_(deletes)))
+        db.execute(delete(models.Task).where(models.Task.id.in_(deletes)))
+    
+    if completion_logs:
+        db.execute(insert(models.Log), completion_logs)
+    
+    adjust_project_counters(db, deltas)
+    adjust_completion_rollup(db, completions)
+    if creates or updates or deletes:
+        mark_user_data_changed(db, user_id)
+    db.commit()
+    
+    return schemas.TaskBatchResult(
+        created=len(creates),
+        updated=len(updates),
+        deleted=len(deletes),
+        results=results,
+    )
+
+# Bulk import
+# Each call imports one chunk of validated rows in a single transaction:
+# one query checks the projects (by id or name), one resolves assignees,
+# and the tasks go in through _insert_tasks like a batch's creates.
+TASK_CREATE_FIELDS = tuple(schemas.TaskCreate.__fields__)
+
+def _import_projects(db: Session, user_id: int, rows: List[schemas.TaskImportRow]):
+    # The user's projects among those referenced, by id and by name; names
+    # shared by several of them map to None
+    ids = {row.project_id for row in rows if row.project_id is not None}
+    names = {row.project_name for row in rows if row.project_id is None}
+    owned, by_name = set(), {}
+    projects = db.execute(
+        select(models.Project.id, models.Project.name)
+        .where(models.Project.user_id == user_id, or_(models.Project.id.in_(ids), models.Project.name.in_(names)))
+    )
+    for project_id, name in projects:
+        owned.add(project_id)
+        if name in names:
+            by_name[name] = None if name in by_name else project_id
+    return owned, by_name
+
+def _resolve_assignees(db: Session, rows: List[schemas.TaskImportRow]) -> Dict[tuple, int]:
+    # Keyed by ("id", 3), ("username", "alice") or ("email", "alice@example.com")
+    ids = {row.assignee_id for row in rows if row.assignee_id is not None}
+    usernames = {row.assignee_username for row in rows if row.assignee_username}
+    emails = {row.assignee_email for row in rows if row.assignee_email}
+    if not (ids or usernames or emails):
+        return {}
+    users = db.execute(
+        select(models.User.id, models.User.username, models.User.email)
+        .where(or_(models.User.id.in_(ids), models.User.username.in_(usernames), models.User.email.in_(emails)))
+    )
+    found = {}
+    for user in users:
+        found[("id", user.id)] = user.id
+        found[("username", user.username)] = user.id
+        found[("email", user.email)] = user.id
+    return found
+
+def _assignee_key(row: schemas.TaskImportRow) -> Optional[tuple]:
+    if row.assignee_id is not None:
+        return ("id", row.assignee_id)
+    if row.assignee_username:
+        return ("username", row.assignee_username)
+    if row.assignee_email:
+        return ("email", row.assignee_email)
+    return None
+
+def import_tasks(db: Session, user_id: int, rows: List[schemas.TaskImportRow]) -> Tuple[int, List[Tuple[int, str]]]:
+    """Create a chunk of imported tasks in the user's projects.
+    
+    Returns the number of tasks created and an (index, error) pair for
+    every row that was skipped, e.g. for an unknown project or assignee.
+    """
+    errors, items = [], []
+    owned, by_name = _import_projects(db, user_id, rows)
+    assignees = _resolve_assignees(db, rows)
+    
+    for index, row in enumerate(rows):
+        project_id = row.project_id
+        if project_id is None:
+            project_id = by_name.get(row.project_name)
+            if project_id is None:
+                errors.append((index, "Project name is ambiguous" if row.project_name in by_name else "Project not found"))
+                continue
+        elif project_id not in owned:
+            errors.append((index, "Project not found"))
+            continue
+        key = _assignee_key(row)
+        if key is not None and key not in assignees:
+            errors.append((index, "Assignee not found"))
+            continue
+        # dict(row) is a shallow copy, all TaskCreate fields are flat
+        values = dict(row)
+        item = {name: values[name] for name in TASK_CREATE_FIELDS}
+        item.update(project_id=project_id, assignee_id=assignees[key] if key is not None else None)
+        items.append(item)
+    
+    if items:
+        deltas, completions, completion_logs = {}, {}, []
+        _insert_tasks(db, items, datetime.now(), deltas, completions, completion_logs)
+        if completion_logs:
+            db.execute(insert(models.Log), completion_logs)
+        adjust_project_counters(db, deltas)
+        adjust_completion_rollup(db, completions)
+        mark_user_data_changed(db, user_id)
+        db.commit()
+    
+    return len(items), errors
+
+def import_projects(db: Session, user_id: int, rows: List[schemas.ProjectImportRow]) -> Tuple[int, List[Tuple[int, str]]]:
+    """Create a chunk of imported projects owned by the user.
+    
+    Team members are given by username; rows naming an unknown user are
+    skipped and reported, as (index, error) pairs.
+    """
+    errors = []
+    usernames = {name for row in rows for name in row.team}
+    members = {}
+    if usernames:
+        members = dict(db.execute(
+            select(models.User.username, models.User.id).where(models.User.username.in_(usernames))
+        ).all())
+    
+    creates = []
+    for index, row in enumerate(rows):
+        unknown = [name for name in row.team if name not in members]
+        if unknown:
+            errors.append((index, f"Unknown team member(s): {', '.join(unknown)}"))
+        else:
+            creates.append(row)
+    
+    if creates:
+        # Sorted RETURNING ids line up with the rows, as in apply_task_batch
+        values = [{**row.dict(exclude={"team"}), "user_id": user_id} for row in creates]
+        projects = models.Project.__table__
+        new_ids = sorted(db.scalars(insert(projects).returning(projects.c.id), values).all())
+        team_rows = [
+            {"project_id": project_id, "user_id": members[name]}
+            for row, project_id in zip(creates, new_ids) for name in dict.fromkeys(row.team)
+        ]
+        if team_rows:
+            db.execute(insert(models.project_team_members), team_rows)
+        mark_user_data_changed(db, user_id)
+        db.commit()
+    
+    return len(creates), errors
+
+def write_back_schedule(db: Session, tasks: List[models.Task], original: Dict[int, tuple]) -> int:
+    """Persist optimized schedules in one executemany UPDATE and commit.
+    
+    `original` maps task id to its (due_date, priority) before optimization;
+    only tasks whose schedule differs from it are written. Returns the
+    number of changed rows.
+    """
+    changes = [
+        {"id": task.id, "due_date": task.due_date, "priority": task.priority}
+        for task in tasks
+        if original.get(task.id, (None, None)) != (task.due_date, task.priority)
+    ]
+    if not changes:
+        return 0
+    
+    # The tasks were read before the optimizer ran; the rollup moves by
+    # their state now, locked until the write-back commits
+    _lock_tasks(db, [change["id"] for change in changes])
+    current = {
+        row.id: row
+        for row in db.execute(
+            select(models.Task.id, models.Task.project_id, models.Task.status,
+                   models.Task.priority, models.Task.completed_at)
+            .where(models.Task.id.in_([change["id"] for change in changes]))
+        )
+    }
+    changes = [change for change in changes if change["id"] in current]
+    
+    # A completed task whose priority changed moves rollup buckets
+    completions = {}
+    for change in changes:
+        task = current[change["id"]]
+        count_task_completion(
+            completions,
+            old=_completion_state(task),
+            new=(task.project_id, task.status, change["priority"], task.completed_at),
+        )
+    if changes:
+        db.execute(update(models.Task), changes)
+        adjust_completion_rollup(db, completions)
+        _mark_projects_changed(db, [current[change["id"]].project_id for change in changes])
+    db.commit()
+    return len(changes)
+
+# Project task counters
+# Project.total_tasks / done_tasks are adjusted in the same transaction as
+# every task write, and completion_percentage is derived from them in the
+# same UPDATE, so no write ever has to count a project's tasks.
+def _completion_percentage(total, done):
+    return case((total > 0, done * 100.0 / total), else_=0)
+
+def count_task_change(deltas: Dict[int, tuple], old: Optional[tuple] = None, new: Optional[tuple] = None):
+    """Record how a task moving from `old` to `new` shifts project counters.
+    
+    `old` and `new` are (project_id, status) pairs, None for a task that is
+    being created or deleted. `deltas` maps project id to a
+    (total_tasks, done_tasks) delta and is meant for adjust_project_counters.
+    """
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None or state[0] is None:
+            continue
+        project_id, status = state
+        total, done = deltas.get(project_id, (0, 0))
+        deltas[project_id] = (total + sign, done + sign * int(status == models.TaskStatus.DONE))
+
+def adjust_project_counters(db: Session, deltas: Dict[int, tuple]):
+    """Apply counter deltas in one executemany UPDATE, without committing."""
+    rows = [
+        {"b_id": project_id, "b_total": total, "b_done": done}
+        for project_id, (total, done) in deltas.items()
+        if total or done
+    ]
+    if not rows:
         return
     
-    # Count total and completed tasks
-    total_tasks = db.query(models.Task).filter(models.Task.project_id == project_id).count()
-    completed_tasks = db.query(models.Task).filter(
-        models.Task.project_id == project_id,
-        models.Task.status == models.TaskStatus.DONE
-    ).count()
+    projects = models.Project.__table__
+    new_total = projects.c.total_tasks + bindparam("b_total")
+    new_done = projects.c.done_tasks + bindparam("b_done")
+    stmt = (
+        update(projects)
+        .where(projects.c.id == bindparam("b_id"))
+        .values(
+            total_tasks=new_total,
+            done_tasks=new_done,
+            completion_percentage=_completion_percentage(new_total, new_done),
+            # Not an edit of the project: keep its updated_at (and with it
+            # the project list order); project_fingerprint covers the tasks
+            updated_at=projects.c.updated_at,
+        )
+    )
+    db.execute(stmt, rows)
+
+def recount_project_counters(db: Session, project_ids: Optional[Iterable[int]] = None,
+                             dry_run: bool = False) -> List[dict]:
+    """Recompute project counters from the tasks table.
     
-    # Calculate completion percentage
-    completion_percentage = 0
-    if total_tasks > 0:
-        completion_percentage = (completed_tasks / total_tasks) * 100
+    Returns the projects whose stored counters had drifted, with their
+    stored and actual values. Unless `dry_run` is set the drifted counters
+    are corrected and committed.
+    """
+    counts = (
+        select(
+            models.Project.id.label("project_id"),
+            models.Project.total_tasks,
+            models.Project.done_tasks,
+            func.count(models.Task.id).label("actual_total"),
+            func.coalesce(
+                func.sum(case((models.Task.status == models.TaskStatus.DONE, 1), else_=0)), 0
+            ).label("actual_done"),
+        )
+        .outerjoin(models.Task, models.Task.project_id == models.Project.id)
+        .group_by(models.Project.id, models.Project.total_tasks, models.Project.done_tasks)
+    )
+    if project_ids is not None:
+        counts = counts.where(models.Project.id.in_(list(project_ids)))
+    
+    drifted = [
+        dict(row._mapping)
+        for row in db.execute(counts)
+        if (row.total_tasks, row.done_tasks) != (row.actual_total, row.actual_done)
+    ]
+    
+    if drifted and not dry_run:
+        projects = models.Project.__table__
+        total, done = bindparam("b_total"), bindparam("b_done")
+        db.execute(
+            update(projects)
+            .where(projects.c.id == bindparam("b_id"))
+            .values(
+                total_tasks=total,
+                done_tasks=done,
+                completion_percentage=_completion_percentage(total, done),
+            ),
+            [
+                {"b_id": row["project_id"], "b_total": row["actual_total"], "b_done": row["actual_done"]}
+                for row in drifted
+            ]
+        )
+        db.commit()
     
-    # Update project
-    project.completion_percentage = completion_percentage
+    return drifted
+
+# Daily completion rollup
+# task_completion_daily counts completed tasks per (project owner, project,
+# priority, day of completed_at). Like the project counters it is adjusted
+# in the same transaction as every task write, so analytics read a handful
+# of rollup rows instead of scanning tasks.
+def _completion_state(task) -> tuple:
+    return (task.project_id, task.status, task.priority, task.completed_at)
+
+def count_task_completion(deltas: Dict[tuple, int], old: Optional[tuple] = None, new: Optional[tuple] = None):
+    """Record how a task moving from `old` to `new` shifts the completion rollup.
+    
+    `old` and `new` are (project_id, status, priority, completed_at) tuples,
+    None for a task that is being created or deleted. Only DONE tasks are
+    counted. `deltas` maps (project_id, priority, day) to a count delta and
+    is meant for adjust_completion_rollup.
+    """
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        project_id, status, priority, completed_at = state
+        if project_id is None or status != models.TaskStatus.DONE or completed_at is None:
+            continue
+        key = (project_id, priority or models.Priority.MEDIUM, completed_at.date())
+        deltas[key] = deltas.get(key, 0) + sign
+
+def adjust_completion_rollup(db: Session, deltas: Dict[tuple, int]):
+    """Apply rollup deltas in one executemany upsert, without committing."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    
+    # Rollup rows are keyed by the project owner
+    owners = dict(db.execute(
+        select(models.Project.id, models.Project.user_id)
+        .where(models.Project.id.in_({project_id for project_id, _, _ in deltas}))
+    ).all())
+    rows = [
+        {"user_id": owners[project_id], "project_id": project_id, "priority": priority, "day": day, "completed": delta}
+        for (project_id, priority, day), delta in deltas.items()
+        if project_id in owners
+    ]
+    
+    rollup = models.TaskCompletionDaily.__table__
+    stmt = _dialect_insert(db, rollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rollup.c.user_id, rollup.c.project_id, rollup.c.priority, rollup.c.day],
+        set_={"completed": rollup.c.completed + stmt.excluded.completed},
+    )
+    db.execute(stmt, rows)
+
+def _completion_day(db: Session, column):
+    # CAST(... AS DATE) has numeric affinity on SQLite and yields the year
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+def rebuild_completion_rollup(db: Session, user_id: Optional[int] = None) -> int:
+    """Rebuild the completion rollup from the tasks table and commit.
+    
+    Limited to the projects of `user_id` when given. Returns the number of
+    rollup rows written.
+    """
+    rollup = models.TaskCompletionDaily.__table__
+    day = _completion_day(db, models.Task.completed_at)
+    # Tasks without a priority count as MEDIUM, so group on the coalesced
+    # value: a NULL and a MEDIUM group would collide on the rollup's key
+    priority = func.coalesce(models.Task.priority, models.Priority.MEDIUM.name)
+    counts = (
+        select(models.Project.user_id, models.Task.project_id, priority, day, func.count())
+        .join(models.Project, models.Project.id == models.Task.project_id)
+        .where(
+            models.Task.status == models.TaskStatus.DONE,
+            models.Task.completed_at.isnot(None),
+            models.Project.user_id.isnot(None),
+        )
+        .group_by(models.Project.user_id, models.Task.project_id, priority, day)
+    )
+    clear = delete(rollup)
+    if user_id is not None:
+        counts = counts.where(models.Project.user_id == user_id)
+        clear = clear.where(rollup.c.user_id == user_id)
+    
+    db.execute(clear)
+    result = db.execute(
+        insert(rollup).from_select(
+            [rollup.c.user_id, rollup.c.project_id, rollup.c.priority, rollup.c.day, rollup.c.completed],
+            counts,
+        )
+    )
     db.commit()
+    return result.rowcount
 
 # Analytics CRUD operations
+def _count_where(condition):
+    # Conditional aggregate: COUNT of rows matching `condition`, portable
+    # across SQLite and PostgreSQL and 0 rather than NULL on an empty set
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
 def get_project_stats(db: Session, user_id: int) -> schemas.ProjectStats:
-    # Get projects owned by user
-    user_projects = db.query(models.Project).filter(models.Project.user_id == user_id)
-    
-    # Count statistics
-    total_projects = user_projects.count()
-    active_projects = user_projects.filter(models.Project.status == models.ProjectStatus.ACTIVE).count()
-    completed_projects = user_projects.filter(models.Project.status == models.ProjectStatus.COMPLETED).count()
-    
-    # Get overdue projects
-    overdue_projects = user_projects.filter(
-        models.Project.end_date < datetime.now(),
-        models.Project.status != models.ProjectStatus.COMPLETED
-    ).count()
-    
-    # Get project IDs for task queries
-    project_ids = [p.id for p in user_projects.all()]
-    
-    # Task statistics
-    tasks_query = db.query(models.Task).filter(models.Task.project_id.in_(project_ids))
-    total_tasks = tasks_query.count()
-    completed_tasks = tasks_query.filter(models.Task.status == models.TaskStatus.DONE).count()
-    overdue_tasks = tasks_query.filter(
-        models.Task.due_date < datetime.now(),
-        models.Task.status != models.TaskStatus.DONE
-    ).count()
+    now = datetime.now()
+    
+    # Project statistics in one pass over the user's projects
+    project_row = db.execute(
+        select(
+            func.count(models.Project.id),
+            _count_where(models.Project.status == models.ProjectStatus.ACTIVE),
+            _count_where(models.Project.status == models.ProjectStatus.COMPLETED),
+            _count_where(
+                (models.Project.end_date < now)
+                & (models.Project.status != models.ProjectStatus.COMPLETED)
+            ),
+        ).where(models.Project.user_id == user_id)
+    ).one()
+    total_projects, active_projects, completed_projects, overdue_projects = project_row
+    
+    # Task statistics in one pass over the tasks of those projects
+    task_row = db.execute(
+        select(
+            func.count(models.Task.id),
+            _count_where(models.Task.status == models.TaskStatus.DONE),
+            _count_where(
+                (models.Task.due_date < now)
+                & (models.Task.status != models.TaskStatus.DONE)
+            ),
+        )
+        .join(models.Project, models.Project.id == models.Task.project_id)
+        .where(models.Project.user_id == user_id)
+    ).one()
+    total_tasks, completed_tasks, overdue_tasks = task_row
     
     # Calculate completion rate
     completion_rate = 0
@@ -298,33 +1401,47 @@ def get_project_stats(db: Session, user_id: int) -> schemas.ProjectStats:
 
 def get_task_completion_stats(db: Session, user_id: int, project_id: Optional[int] = None, 
                               time_range: str = "month") -> schemas.TaskCompletionStats:
-    # Get projects owned by user
-    user_projects = db.query(models.Project.id).filter(models.Project.user_id == user_id)
+    # Determine time range
+    days = {"week": 7, "month": 30, "year": 365}.get(time_range, 30)  # Default to month
+    start_day = (datetime.now() - timedelta(days=days)).date()
     
-    # Base query for tasks in user's projects
-    query = db.query(models.Task).filter(models.Task.project_id.in_(user_projects))
+    # Completions come from the daily rollup, pending tasks from the project
+    # counters, both in one statement
+    rollup = models.TaskCompletionDaily
+    completed = (
+        select(
+            literal("completed").label("kind"),
+            rollup.day,
+            rollup.priority,
+            models.Project.name,
+            rollup.completed.label("count"),
+        )
+        .join(models.Project, models.Project.id == rollup.project_id)
+        .where(rollup.user_id == user_id, rollup.day >= start_day, rollup.completed > 0)
+    )
+    pending = (
+        select(
+            literal("pending"), null(), null(), null(),
+            func.coalesce(func.sum(models.Project.total_tasks - models.Project.done_tasks), 0),
+        )
+        .where(models.Project.user_id == user_id)
+    )
     
     # Apply project filter if provided
     if project_id is not None:
-        query = query.filter(models.Task.project_id == project_id)
-    
-    # Determine time range
-    now = datetime.now()
-    if time_range == "week":
-        start_date = now - timedelta(days=7)
-    elif time_range == "month":
-        start_date = now - timedelta(days=30)
-    elif time_range == "year":
-        start_date = now - timedelta(days=365)
-    else:
-        start_date = now - timedelta(days=30)  # Default to month
-    
-    # Apply time range filter
-    time_filtered_query = query.filter(models.Task.updated_at >= start_date)
+        completed = completed.where(rollup.project_id == project_id)
+        pending = pending.where(models.Project.id == project_id)
     
-    # Count completed and pending tasks
-    total_completed = time_filtered_query.filter(models.Task.status == models.TaskStatus.DONE).count()
-    total_pending = time_filtered_query.filter(models.Task.status != models.TaskStatus.DONE).count()
+    total_completed = total_pending = 0
+    by_day, by_priority, by_project = {}, {}, {}
+    for row in db.execute(union_all(completed, pending)):
+        if row.kind == "pending":
+            total_pending = row.count
+            continue
+        total_completed += row.count
+        by_day[row.day] = by_day.get(row.day, 0) + row.count
+        by_priority[row.priority.name] = by_priority.get(row.priority.name, 0) + row.count
+        by_project[row.name] = by_project.get(row.name, 0) + row.count
     
     # Calculate completion rate
     completion_rate = 0
@@ -332,70 +1449,11 @@ def get_task_completion_stats(db: Session, user_id: int, project_id: Optional[in
     if total_tasks > 0:
         completion_rate = (total_completed / total_tasks) * 100
     
-    # Group by date
-    task_completion_by_date = (
-        db.query(
-            cast(models.Task.updated_at, Date).label('date'),
-            func.count().label('count')
-        )
-        .filter(
-            models.Task.project_id.in_(user_projects),
-            models.Task.status == models.TaskStatus.DONE,
-            models.Task.updated_at >= start_date
-        )
-        .group_by(cast(models.Task.updated_at, Date))
-        .order_by(cast(models.Task.updated_at, Date))
-        .all()
-    )
-    
-    # Transform to TimeSeriesPoint
-    by_date = [
-        schemas.TimeSeriesPoint(date=entry.date, value=entry.count)
-        for entry in task_completion_by_date
-    ]
-    
-    # Group by priority
-    task_completion_by_priority = (
-        db.query(
-            models.Task.priority,
-            func.count().label('count')
-        )
-        .filter(
-            models.Task.project_id.in_(user_projects),
-            models.Task.status == models.TaskStatus.DONE,
-            models.Task.updated_at >= start_date
-        )
-        .group_by(models.Task.priority)
-        .all()
-    )
-    
-    # Transform to dictionary
-    by_priority = {str(p.priority.name): p.count for p in task_completion_by_priority}
-    
-    # Group by project
-    task_completion_by_project = (
-        db.query(
-            models.Project.name,
-            func.count().label('count')
-        )
-        .join(models.Task, models.Task.project_id == models.Project.id)
-        .filter(
-            models.Task.project_id.in_(user_projects),
-            models.Task.status == models.TaskStatus.DONE,
-            models.Task.updated_at >= start_date
-        )
-        .group_by(models.Project.name)
-        .all()
-    )
-    
-    # Transform to dictionary
-    by_project = {p.name: p.count for p in task_completion_by_project}
-    
     return schemas.TaskCompletionStats(
         total_completed=total_completed,
         total_pending=total_pending,
         completion_rate=completion_rate,
-        by_date=by_date,
+        by_date=[schemas.TimeSeriesPoint(date=day, value=count) for day, count in sorted(by_day.items())],
         by_priority=by_priority,
         by_project=by_project
     ) 
\ No newline at end of file
@@ -1,8 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import os
 from dotenv import load_dotenv
+from typing import Optional
 
 # Load environment variables
 load_dotenv()
@@ -10,14 +15,179 @@ load_dotenv()
 # Database URL setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./project_management.db")
 
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# Connection pool settings. Pre-ping and recycle only apply to server
+# databases, where connections can be dropped behind the pool's back.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+
+# SQLite connection profile: "performance" applies the PRAGMAs below to
+# every new connection, "default" keeps SQLite's own settings
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+SQLITE_PERFORMANCE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers and the writer no longer block each other
+    "synchronous": "NORMAL",  # fsync at checkpoints only, durable with WAL
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),  # wait for locks instead of failing
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),  # negative: size in KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
+
+def engine_options(url: str) -> dict:
+    """create_engine() keyword arguments for `url` from the settings above."""
+    url = make_url(url)
+    pool = {"pool_size": POOL_SIZE, "max_overflow": POOL_MAX_OVERFLOW, "pool_timeout": POOL_TIMEOUT}
+    if url.get_backend_name() != "sqlite":
+        return {**pool, "pool_recycle": POOL_RECYCLE, "pool_pre_ping": POOL_PRE_PING}
+    
+    options = {"connect_args": {"check_same_thread": False}}
+    if url.database in (None, "", ":memory:") or url.get_driver_name() == "aiosqlite":
+        # In-memory databases live in a single connection and aiosqlite opens
+        # one per checkout (NullPool), there is no pool to size
+        return options
+    return {**options, **pool}
+
+def apply_sqlite_profile(engine, profile: str = SQLITE_PROFILE):
+    if engine.dialect.name != "sqlite" or profile != "performance":
+        return
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PERFORMANCE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_app_engine(url: str = DATABASE_URL, sqlite_profile: str = SQLITE_PROFILE):
+    engine = create_engine(url, **engine_options(url))
+    apply_sqlite_profile(engine, sqlite_profile)
+    return engine
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+engine = create_app_engine(DATABASE_URL)
 
 # Create session maker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create base class for declarative models
-Base = declarative_base() 
\ No newline at end of file
+Base = declarative_base() 
+
+# Async engine for the API (ASYNC_DB=true): asyncpg for PostgreSQL,
+# aiosqlite for SQLite, with the same pool settings and SQLite profile.
+# The sync engine above keeps serving scripts and migrations.
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+async_engine = None
+if ASYNC_DB:
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL), **engine_options(async_database_url(DATABASE_URL))
+    )
+    apply_sqlite_profile(async_engine.sync_engine)
+
+# Objects stay loaded after commit: responses are serialized outside the
+# session's greenlet, where expired attributes could not be reloaded
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, expire_on_commit=False, autoflush=False
+) if ASYNC_DB else None
+
+def _pool_capacity(engine):
+    pool = engine.pool
+    overflow = getattr(pool, "_max_overflow", -1)
+    if not hasattr(pool, "size") or overflow < 0:
+        return None
+    return pool.size() + overflow
+
+_session_slots = None
+
+def _threaded_session_slots():
+    # Created on first use, inside the running event loop
+    global _session_slots
+    capacity = _pool_capacity(engine)
+    if capacity is not None and _session_slots is None:
+        _session_slots = asyncio.Semaphore(capacity)
+    return _session_slots
+
+class ThreadedSession:
+    """A sync Session behind AsyncSession's run_sync() interface.
+    
+    Lets the async handlers call the crud functions the same way on both
+    engines: run_sync() runs them on the threadpool with the wrapped Session.
+    
+    The Session keeps its connection between run_sync() calls while it waits
+    for a thread, so a session takes one of the pool's slots on its first
+    call and returns it on close(). With no more sessions active than the
+    pool holds, no thread ever blocks on a pool checkout, and requests that
+    hold connections cannot be starved of threads by requests waiting for one.
+    """
+    
+    def __init__(self, sync_session, slots: Optional[asyncio.Semaphore] = None):
+        self.sync_session = sync_session
+        self._slots = slots
+        self._holding_slot = False
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        if self._slots is not None and not self._holding_slot:
+            await self._slots.acquire()
+            self._holding_slot = True
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+    
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+        if self._holding_slot:
+            self._holding_slot = False
+            self._slots.release()
+
+# Stream the rows of a statement in lists of `size` from a server-side
+# cursor (psycopg2 named cursor / asyncpg cursor; SQLite steps its cursor),
+# so large reads run in constant memory. Works with both session types
+# get_async_db hands out.
+async def stream_partitions(db, statement, size: int = 1000):
+    statement = statement.execution_options(yield_per=size)
+    if isinstance(db, ThreadedSession):
+        result = await db.run_sync(lambda session: session.execute(statement))
+        partitions = result.partitions()
+        try:
+            while True:
+                rows = await run_in_threadpool(next, partitions, None)
+                if rows is None:
+                    break
+                yield rows
+        finally:
+            await run_in_threadpool(result.close)
+        return
+    
+    result = await db.stream(statement)
+    try:
+        async for rows in result.partitions():
+            yield rows
+    finally:
+        await result.close()
+
+# Dependency to get the request's DB session. FastAPI resolves it once per
+# request, so get_current_user and the handler share one session (and one
+# pooled connection).
+async def get_async_db():
+    if ASYNC_DB:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+    
+    session = ThreadedSession(SessionLocal(), _threaded_session_slots())
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -0,0 +1,39 @@
+"""
+Conditional GET helpers
+-----------------------
+
+ETags for the project and task read routes are computed before anything is
+loaded, from the request URL, the user's data version and a row fingerprint
+(see crud.task_fingerprint / crud.project_fingerprint). They are weak: two
+responses with the same tag are equivalent, not checked byte for byte.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(request: Request, *parts) -> str:
+    # The query string selects the page and fieldset, so it is part of the tag
+    query = sorted(request.query_params.multi_items())
+    digest = hashlib.blake2b(repr((request.url.path, query, parts)).encode(), digest_size=16)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of `etag` against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
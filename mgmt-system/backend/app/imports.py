@@ -0,0 +1,146 @@
+"""
+Bulk imports
+------------
+
+Reads a CSV or NDJSON upload as it streams in, parses and validates it in
+chunks of IMPORT_CHUNK_SIZE rows (on the threadpool) and hands each chunk
+to crud.import_tasks / crud.import_projects, which insert it in one
+transaction. Rows that fail to parse, validate or resolve are skipped and
+reported by their position in the file; the other rows are still imported.
+
+The columns are those of the exports (see export.py). In CSV files empty
+cells count as missing and the list columns (tags, team) are "|"-separated.
+"""
+
+import codecs
+import csv
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Type
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+
+from . import schemas
+
+IMPORT_CHUNK_SIZE = 2000
+IMPORT_MAX_ERRORS = 1000  # Errors listed in the result; all are counted
+LIST_COLUMNS = ("tags", "team")
+
+ChunkImporter = Callable[[List[BaseModel]], Awaitable[Tuple[int, List[Tuple[int, str]]]]]
+
+
+async def _line_batches(stream: AsyncIterator[bytes]):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in stream:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        if lines:
+            yield lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield [pending]
+
+
+async def _record_batches(stream: AsyncIterator[bytes], format: str):
+    """Raw records of the upload, in batches: NDJSON lines or CSV records."""
+    if format != "csv":
+        async for lines in _line_batches(stream):
+            yield [line for line in lines if line.strip()]
+        return
+
+    # A CSV record ends at the first line end outside quotes, i.e. once it
+    # holds an even number of quote characters ("" escapes one)
+    record, quotes = [], 0
+    async for lines in _line_batches(stream):
+        records = []
+        for line in lines:
+            record.append(line)
+            quotes += line.count('"')
+            if quotes % 2 == 0:
+                if record != [""] and record != ["\r"]:
+                    records.append("\n".join(record))
+                record, quotes = [], 0
+        yield records
+    if record:
+        yield ["\n".join(record)]
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        e["msg"] if e["loc"] == ("__root__",) else f"{'.'.join(map(str, e['loc']))}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def _parse_chunk(records: List[str], format: str, header: Optional[List[str]], row_schema: Type[BaseModel]):
+    """Parse and validate raw records into (rows, their indexes, (index, error) pairs)."""
+    rows, indexes, errors, parsed = [], [], [], []
+    if format != "csv":
+        for record in records:
+            try:
+                parsed.append(orjson.loads(record))
+            except orjson.JSONDecodeError:
+                parsed.append("Invalid JSON")
+    else:
+        for cells in csv.reader(records):
+            if len(cells) != len(header):
+                parsed.append(f"Expected {len(header)} columns, got {len(cells)}")
+                continue
+            data = {name: value for name, value in zip(header, cells) if value != ""}
+            for name in LIST_COLUMNS:
+                if name in data:
+                    data[name] = data[name].split("|")
+            parsed.append(data)
+
+    for index, data in enumerate(parsed):
+        if isinstance(data, str):
+            errors.append((index, data))
+        elif not isinstance(data, dict):
+            errors.append((index, "Expected a JSON object"))
+        else:
+            try:
+                rows.append(row_schema.parse_obj(data))
+                indexes.append(index)
+            except ValidationError as e:
+                errors.append((index, _validation_message(e)))
+    return rows, indexes, errors
+
+
+async def run_import(stream: AsyncIterator[bytes], format: str, row_schema: Type[BaseModel],
+                     import_chunk: ChunkImporter) -> schemas.ImportResult:
+    received = created = failed = 0
+    errors: List[schemas.ImportRowError] = []
+    header = None
+
+    def report(first_row: int, chunk_errors):
+        nonlocal failed
+        failed += len(chunk_errors)
+        for index, error in chunk_errors:
+            if len(errors) < IMPORT_MAX_ERRORS:
+                errors.append(schemas.ImportRowError(row=first_row + index, error=error))
+
+    async def flush(records):
+        nonlocal created
+        rows, indexes, chunk_errors = await run_in_threadpool(_parse_chunk, records, format, header, row_schema)
+        if rows:
+            count, import_errors = await import_chunk(rows)
+            created += count
+            chunk_errors += [(indexes[index], error) for index, error in import_errors]
+        report(received - len(records) + 1, sorted(chunk_errors))
+
+    pending: List[str] = []
+    async for records in _record_batches(stream, format):
+        if format == "csv" and header is None and records:
+            header = [name.strip() for name in next(csv.reader(records[:1]))]
+            records = records[1:]
+        for record in records:
+            pending.append(record)
+            received += 1
+            if len(pending) == IMPORT_CHUNK_SIZE:
+                await flush(pending)
+                pending = []
+    if pending:
+        await flush(pending)
+
+    return schemas.ImportResult(received=received, created=created, failed=failed, errors=errors)
@@ -1,21 +1,105 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import List, Optional
 
 from . import models, schemas, crud
-from .database import engine, SessionLocal, Base
+from .pagination import next_cursor
+from .serializers import (
+    PROJECT_FIELDS, PROJECT_RELATIONS, TASK_FIELDS, TASK_RELATIONS, parse_fieldset,
+    serialize_project, serialize_projects, serialize_rows, serialize_task, serialize_tasks,
+)
+from .database import engine, get_async_db, stream_partitions
+from .etags import etag_matches, make_etag, not_modified
+from .export import export_response
+from .imports import run_import
+from .search import search_cursor
 from .auth import auth_router, get_current_user
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic (see migrations/), run `alembic upgrade head`
 
 app = FastAPI(
     title="AI Project Management System",
     description="API for managing projects and tasks with AI-powered automation",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Task and project graphs skip response_model validation: they are built
+# into dicts by serializers.py and encoded by orjson. The response_model
+# still documents each route.
+
+# Sparse fieldsets for the read routes: `fields=` narrows the scalar fields,
+# `include=` the embedded relations (comma-separated). Only what is asked
+# for is selected and loaded.
+def requested_fieldset(fields: Optional[str], include: Optional[str], scalar_fields, relations):
+    try:
+        return parse_fieldset(fields, include, scalar_fields, relations)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Filters of the task list routes (see crud.task_filter_conditions). Sets
+# are comma-separated, e.g. ?status=todo,in-progress&priority=urgent, and
+# due dates are bounded by [due_from, due_before), so a calendar month is
+# ?due_from=2026-10-01T00:00:00&due_before=2026-11-01T00:00:00
+def comma_separated(value: Optional[str]) -> Optional[List[str]]:
+    items = [item.strip() for item in (value or "").split(",") if item.strip()]
+    return items or None
+
+def parse_choices(value: Optional[str], enum, name: str):
+    items = comma_separated(value)
+    if items is None:
+        return None
+    choices = {member.value: member for member in enum}
+    for item in items:
+        if item not in choices:
+            raise HTTPException(
+                status_code=400, detail=f"Unsupported {name} '{item}', expected one of: {', '.join(choices)}"
+            )
+    return [choices[item] for item in items]
+
+def task_filters(
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee_id: Optional[int] = None,
+    due_from: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    tags: Optional[str] = None,  # Tasks with any of these tags
+    tags_all: Optional[str] = None,  # Tasks with all of these tags
+) -> dict:
+    return dict(
+        project_id=project_id,
+        status=parse_choices(status, models.TaskStatus, "status"),
+        priority=parse_choices(priority, models.Priority, "priority"),
+        assignee_id=assignee_id,
+        due_from=due_from,
+        due_before=due_before,
+        tags=comma_separated(tags),
+        tags_all=comma_separated(tags_all),
+    )
+
+# Conditional GETs: the read routes tag responses with an ETag known before
+# anything is loaded (one aggregate query, see etags.py), and answer a
+# matching If-None-Match with 304 Not Modified
+async def response_etag(request: Request, db: AsyncSession, user_id: int, fingerprint, **params) -> str:
+    rows = await db.run_sync(fingerprint, user_id=user_id, **params)
+    return make_etag(request, user_id, crud.user_data_version(user_id), rows)
+
+# Single-resource reads answer 404 before looking at If-None-Match: the
+# fingerprint counts no rows for a resource that is missing or not the
+# user's, and "If-None-Match: *" must not match it (RFC 9110, 13.1.2)
+async def existing_resource_etag(request: Request, db: AsyncSession, user_id: int, fingerprint,
+                                 not_found: str, **params) -> str:
+    rows = await db.run_sync(fingerprint, user_id=user_id, **params)
+    if not rows[0]:
+        raise HTTPException(status_code=404, detail=not_found)
+    return make_etag(request, user_id, crud.user_data_version(user_id), rows)
+
 # CORS Configuration
 origins = [
     "http://localhost:3000",
@@ -29,18 +113,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Tasks-Changed", "ETag", "Content-Disposition"],
 )
 
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# DB sessions for the handlers come from database.get_async_db: an
+# AsyncSession with ASYNC_DB enabled, a threadpool-backed Session otherwise.
+# Either way the crud functions run through `await db.run_sync(...)`.
 
 # Root endpoint
 @app.get("/", tags=["Root"])
@@ -52,193 +133,384 @@ async def root():
 
 # Projects endpoints
 @app.post("/api/projects/", response_model=schemas.Project, tags=["Projects"])
-def create_project(
+async def create_project(
     project: schemas.ProjectCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    return crud.create_project(db=db, project=project, user_id=current_user.id)
+    db_project = await db.run_sync(crud.create_project, project=project, user_id=current_user.id)
+    return ORJSONResponse(serialize_project(db_project))
 
 @app.get("/api/projects/", response_model=List[schemas.Project], tags=["Projects"])
-def read_projects(
+async def read_projects(
+    request: Request,
+    skip: int = 0, 
+    limit: int = 100, 
+    sort: Optional[str] = None,  # "id", "end_date", "updated_at" or "priority", "-" prefix for descending
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,  # "owner", "team", "tasks"
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    fieldset = requested_fieldset(fields, include, PROJECT_FIELDS, PROJECT_RELATIONS)
+    etag = await response_etag(request, db, current_user.id, crud.project_fingerprint)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    try:
+        projects = await db.run_sync(
+            crud.get_projects, user_id=current_user.id, skip=skip, limit=limit, sort=sort, cursor=cursor,
+            fieldset=fieldset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Cursor for the next page, if any
+    response = ORJSONResponse(serialize_projects(projects, fieldset), headers={"ETag": etag})
+    cursor = next_cursor(projects, sort, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return response
+
+@app.get("/api/projects/summary", response_model=List[schemas.ProjectSummary], tags=["Projects"])
+async def read_project_summaries(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    projects = crud.get_projects(db, user_id=current_user.id, skip=skip, limit=limit)
-    return projects
+    rows = await db.run_sync(crud.get_project_summaries, user_id=current_user.id, skip=skip, limit=limit)
+    return ORJSONResponse(serialize_rows(rows))
 
 @app.get("/api/projects/{project_id}", response_model=schemas.Project, tags=["Projects"])
-def read_project(
+async def read_project(
+    request: Request,
     project_id: int, 
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,  # "owner", "team", "tasks"
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    db_project = crud.get_project(db, project_id=project_id)
-    if db_project is None or db_project.user_id != current_user.id:
+    fieldset = requested_fieldset(fields, include, PROJECT_FIELDS, PROJECT_RELATIONS)
+    etag = await existing_resource_etag(
+        request, db, current_user.id, crud.project_fingerprint, "Project not found", project_id=project_id
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    db_project = await db.run_sync(
+        crud.get_project_for_user, project_id=project_id, user_id=current_user.id,
+        options=crud.project_load_options(fieldset)
+    )
+    if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return db_project
+    return ORJSONResponse(serialize_project(db_project, fieldset), headers={"ETag": etag})
 
 @app.put("/api/projects/{project_id}", response_model=schemas.Project, tags=["Projects"])
-def update_project(
+async def update_project(
     project_id: int, 
     project: schemas.ProjectUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    db_project = crud.get_project(db, project_id=project_id)
-    if db_project is None or db_project.user_id != current_user.id:
+    db_project = await db.run_sync(
+        crud.update_project, project_id=project_id, project=project, user_id=current_user.id
+    )
+    if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return crud.update_project(db=db, project_id=project_id, project=project)
+    return ORJSONResponse(serialize_project(db_project))
 
 @app.delete("/api/projects/{project_id}", response_model=schemas.Project, tags=["Projects"])
-def delete_project(
+async def delete_project(
     project_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    db_project = crud.get_project(db, project_id=project_id)
-    if db_project is None or db_project.user_id != current_user.id:
+    db_project = await db.run_sync(crud.delete_project, project_id=project_id, user_id=current_user.id)
+    if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return crud.delete_project(db=db, project_id=project_id)
+    return ORJSONResponse(serialize_project(db_project))
 
 # Tasks endpoints
 @app.post("/api/tasks/", response_model=schemas.Task, tags=["Tasks"])
-def create_task(
+async def create_task(
     task: schemas.TaskCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    # Check if the project exists and belongs to the user
-    project = crud.get_project(db, project_id=task.project_id)
-    if project is None or project.user_id != current_user.id:
+    # Created only if the project exists and belongs to the user
+    db_task = await db.run_sync(crud.create_task, task=task, user_id=current_user.id)
+    if db_task is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return crud.create_task(db=db, task=task)
+    return ORJSONResponse(serialize_task(db_task))
+
+@app.post("/api/tasks/batch", response_model=schemas.TaskBatchResult, tags=["Tasks"])
+async def batch_tasks(
+    batch: schemas.TaskBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    return await db.run_sync(crud.apply_task_batch, user_id=current_user.id, batch=batch)
 
 @app.get("/api/tasks/", response_model=List[schemas.Task], tags=["Tasks"])
-def read_tasks(
+async def read_tasks(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
-    project_id: Optional[int] = None,
-    status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    filters: dict = Depends(task_filters),
+    sort: Optional[str] = None,  # "id", "due_date", "updated_at" or "priority", "-" prefix for descending
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,  # "assignee", "tags", "attachments", "comments"
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    fieldset = requested_fieldset(fields, include, TASK_FIELDS, TASK_RELATIONS)
+    etag = await response_etag(request, db, current_user.id, crud.task_fingerprint, **filters)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    try:
+        tasks = await db.run_sync(
+            crud.get_tasks, 
+            user_id=current_user.id, 
+            skip=skip, 
+            limit=limit,
+            sort=sort,
+            cursor=cursor,
+            fieldset=fieldset,
+            **filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Cursor for the next page, if any
+    response = ORJSONResponse(serialize_tasks(tasks, fieldset), headers={"ETag": etag})
+    cursor = next_cursor(tasks, sort, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return response
+
+@app.get("/api/tasks/summary", response_model=List[schemas.TaskSummary], tags=["Tasks"])
+async def read_task_summaries(
+    skip: int = 0, 
+    limit: int = 100, 
+    filters: dict = Depends(task_filters),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    return crud.get_tasks(
-        db, 
+    rows = await db.run_sync(
+        crud.get_task_summaries, 
         user_id=current_user.id, 
-        project_id=project_id,
-        status=status,
         skip=skip, 
-        limit=limit
+        limit=limit,
+        **filters
     )
+    return ORJSONResponse(serialize_rows(rows))
 
 @app.get("/api/tasks/{task_id}", response_model=schemas.Task, tags=["Tasks"])
-def read_task(
+async def read_task(
+    request: Request,
     task_id: int, 
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,  # "assignee", "tags", "attachments", "comments"
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    db_task = crud.get_task(db, task_id=task_id)
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
+    fieldset = requested_fieldset(fields, include, TASK_FIELDS, TASK_RELATIONS)
+    etag = await existing_resource_etag(
+        request, db, current_user.id, crud.task_fingerprint, "Task not found", task_id=task_id
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
     
-    # Check if the task belongs to a project owned by the user
-    project = crud.get_project(db, project_id=db_task.project_id)
-    if project is None or project.user_id != current_user.id:
+    # Only tasks in projects owned by the user are found
+    db_task = await db.run_sync(
+        crud.get_task_for_user, task_id=task_id, user_id=current_user.id,
+        options=crud.task_load_options(fieldset)
+    )
+    if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    return db_task
+    return ORJSONResponse(serialize_task(db_task, fieldset), headers={"ETag": etag})
 
 @app.put("/api/tasks/{task_id}", response_model=schemas.Task, tags=["Tasks"])
-def update_task(
+async def update_task(
     task_id: int, 
     task: schemas.TaskUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    db_task = crud.get_task(db, task_id=task_id)
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
+    # Tasks can only be moved into projects the user owns
+    if task.project_id is not None:
+        if not await db.run_sync(crud.user_owns_project, project_id=task.project_id, user_id=current_user.id):
+            raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if the task belongs to a project owned by the user
-    project = crud.get_project(db, project_id=db_task.project_id)
-    if project is None or project.user_id != current_user.id:
+    # Only tasks in projects owned by the user are updated
+    db_task = await db.run_sync(crud.update_task, task_id=task_id, task=task, user_id=current_user.id)
+    if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    return crud.update_task(db=db, task_id=task_id, task=task)
+    return ORJSONResponse(serialize_task(db_task))
 
 @app.delete("/api/tasks/{task_id}", response_model=schemas.Task, tags=["Tasks"])
-def delete_task(
+async def delete_task(
     task_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    db_task = crud.get_task(db, task_id=task_id)
+    # Only tasks in projects owned by the user are deleted
+    db_task = await db.run_sync(crud.delete_task, task_id=task_id, user_id=current_user.id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check if the task belongs to a project owned by the user
-    project = crud.get_project(db, project_id=db_task.project_id)
-    if project is None or project.user_id != current_user.id:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    return crud.delete_task(db=db, task_id=task_id)
+    return ORJSONResponse(serialize_task(db_task))
 
 # AI Assistance endpoints
+# The LLM calls block, so they run on the threadpool against objects that
+# were fully loaded beforehand
 @app.post("/api/ai/task-suggestions", response_model=List[schemas.TaskSuggestion], tags=["AI"])
-def get_task_suggestions(
+async def get_task_suggestions(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
     # Check if the project exists and belongs to the user
-    project = crud.get_project(db, project_id=project_id)
-    if project is None or project.user_id != current_user.id:
+    project = await db.run_sync(crud.get_project_for_user, project_id=project_id, user_id=current_user.id)
+    if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
     from .ai.task_suggestions import generate_task_suggestions
-    return generate_task_suggestions(project)
+    return await run_in_threadpool(generate_task_suggestions, project)
 
 @app.post("/api/ai/schedule-optimization", response_model=List[schemas.Task], tags=["AI"])
-def optimize_schedule(
-    db: Session = Depends(get_db),
+async def optimize_schedule(
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
     # Get all tasks for the current user
-    tasks = crud.get_tasks(db, user_id=current_user.id)
+    tasks = await db.run_sync(crud.get_tasks, user_id=current_user.id)
     
-    from .ai.schedule_optimizer import optimize_task_schedule
-    optimized_tasks = optimize_task_schedule(tasks)
+    # Remember the current schedule and detach the loaded graph, so the
+    # optimizer's in-place edits are not flushed row by row
+    original = {task.id: (task.due_date, task.priority) for task in tasks}
+    await db.run_sync(Session.expunge_all)
     
-    # Update the tasks in the database
-    for task in optimized_tasks:
-        crud.update_task(db=db, task_id=task.id, task=schemas.TaskUpdate(
-            due_date=task.due_date,
-            priority=task.priority
-        ))
+    from .ai.schedule_optimizer import optimize_task_schedule
+    optimized_tasks = await run_in_threadpool(optimize_task_schedule, tasks)
     
-    return optimized_tasks
+    # Write back only the changed rows, in a single transaction, and answer
+    # with the tasks as written (new updated_at included), as a GET would
+    changed = await db.run_sync(crud.write_back_schedule, optimized_tasks, original)
+    written = await db.run_sync(crud.get_tasks_by_ids, [task.id for task in optimized_tasks])
+    response = ORJSONResponse(serialize_tasks(written))
+    response.headers["X-Tasks-Changed"] = str(changed)
+    return response
 
 # Analytics endpoints
+# Responses are served from crud.analytics_cache as pre-serialized JSON and
+# recomputed only after one of the user's projects or tasks changed
+async def cached_json(db: AsyncSession, user_id: int, name: str, params: dict, compute) -> Response:
+    key = crud.analytics_cache.key(user_id, name, params)
+    body = crud.analytics_cache.get(key)
+    if body is None:
+        body = (await db.run_sync(compute, user_id=user_id, **params)).json()
+        crud.analytics_cache.set(key, body)
+    return Response(content=body, media_type="application/json")
+
 @app.get("/api/analytics/project-stats", response_model=schemas.ProjectStats, tags=["Analytics"])
-def get_project_stats(
-    db: Session = Depends(get_db),
+async def get_project_stats(
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    return crud.get_project_stats(db, user_id=current_user.id)
+    return await cached_json(db, current_user.id, "project-stats", {}, crud.get_project_stats)
 
 @app.get("/api/analytics/task-completion", response_model=schemas.TaskCompletionStats, tags=["Analytics"])
-def get_task_completion_stats(
+async def get_task_completion_stats(
     project_id: Optional[int] = None,
     time_range: Optional[str] = "month",  # "week", "month", "year"
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    return crud.get_task_completion_stats(
-        db, 
-        user_id=current_user.id, 
-        project_id=project_id, 
-        time_range=time_range
-    ) 
\ No newline at end of file
+    return await cached_json(
+        db, current_user.id, "task-completion",
+        {"project_id": project_id, "time_range": time_range},
+        crud.get_task_completion_stats
+    )
+
+# Import endpoint
+# A CSV or NDJSON file in the request body (not a multipart form), imported
+# in chunks as it is uploaded. Each chunk is committed on its own, so rows
+# before a failure stay imported; failed rows are listed in the result.
+IMPORTERS = {
+    "tasks": (schemas.TaskImportRow, crud.import_tasks),
+    "projects": (schemas.ProjectImportRow, crud.import_projects),
+}
+
+@app.post("/api/import", response_model=schemas.ImportResult, tags=["Import"])
+async def import_rows(
+    request: Request,
+    resource: str = Query("tasks", regex="^(tasks|projects)$"),
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    row_schema, importer = IMPORTERS[resource]
+    
+    async def import_chunk(rows):
+        return await db.run_sync(importer, current_user.id, rows)
+    
+    return await run_import(request.stream(), format, row_schema, import_chunk)
+
+# Search endpoint
+# Ranked matches for every word of `q` (the last one as a prefix) among the
+# user's tasks, projects and comments; X-Next-Cursor continues the list
+@app.get("/api/search", response_model=List[schemas.SearchResult], tags=["Search"])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    try:
+        results = await db.run_sync(
+            crud.search_documents, user_id=current_user.id, q=q, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response = ORJSONResponse(results)
+    cursor = search_cursor(results, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return response
+
+# Export endpoints
+# The whole of a user's tasks or projects as NDJSON or CSV, streamed off a
+# server-side cursor in partitions of EXPORT_PARTITION_SIZE rows, so memory
+# stays flat however much is exported
+EXPORT_PARTITION_SIZE = 1000
+EXPORT_FORMAT = Query("ndjson", regex="^(ndjson|csv)$")
+
+@app.get("/api/export/tasks", tags=["Export"])
+async def export_tasks(
+    format: str = EXPORT_FORMAT,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    statement = crud.task_export_statement(current_user.id, engine.dialect.name)
+    return export_response(
+        stream_partitions(db, statement, EXPORT_PARTITION_SIZE),
+        statement.selected_columns.keys(), format, "tasks", list_columns=("tags",)
+    )
+
+@app.get("/api/export/projects", tags=["Export"])
+async def export_projects(
+    format: str = EXPORT_FORMAT,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    statement = crud.project_export_statement(current_user.id, engine.dialect.name)
+    return export_response(
+        stream_partitions(db, statement, EXPORT_PARTITION_SIZE),
+        statement.selected_columns.keys(), format, "projects", list_columns=("team",)
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Text, DateTime, Table, Enum, JSON, ARRAY
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Text, Date, DateTime, Table, Enum, JSON, ARRAY, Index, case, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -42,6 +42,17 @@ class Priority(str, enum.Enum):
     HIGH = "high"
     URGENT = "urgent"
 
+# Sort rank of a Priority column (LOW=0 ... URGENT=3). The Enum column stores
+# member names, which do not sort in priority order. The expression is fully
+# literal so that the rendered index DDL matches the query text exactly.
+def priority_rank(column):
+    return case(
+        *[
+            (column == literal_column(f"'{member.name}'"), literal_column(str(rank)))
+            for rank, member in enumerate(Priority)
+        ]
+    )
+
 # User model
 class User(Base):
     __tablename__ = "users"
@@ -71,6 +82,9 @@ class Project(Base):
     start_date = Column(DateTime)
     end_date = Column(DateTime)
     completion_percentage = Column(Float, default=0)
+    # Task counters, maintained incrementally by crud.adjust_project_counters
+    total_tasks = Column(Integer, nullable=False, default=0, server_default="0")
+    done_tasks = Column(Integer, nullable=False, default=0, server_default="0")
     budget = Column(Float, default=0)
     expenses = Column(Float, default=0)
     priority = Column(Enum(Priority), default=Priority.MEDIUM)
@@ -97,6 +111,7 @@ class Task(Base):
     due_date = Column(DateTime)
     estimated_hours = Column(Float, default=0)
     actual_hours = Column(Float, default=0)
+    completed_at = Column(DateTime, nullable=True)  # Set when the task moves to DONE
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -111,6 +126,14 @@ class Task(Base):
     attachments = relationship("Attachment", back_populates="task", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
 
+# Indexes backing keyset pagination on (sort key, id)
+Index("ix_projects_end_date_id", Project.end_date, Project.id)
+Index("ix_projects_updated_at_id", Project.updated_at, Project.id)
+Index("ix_projects_priority_rank_id", priority_rank(Project.priority), Project.id)
+Index("ix_tasks_due_date_id", Task.due_date, Task.id)
+Index("ix_tasks_updated_at_id", Task.updated_at, Task.id)
+Index("ix_tasks_priority_rank_id", priority_rank(Task.priority), Task.id)
+
 # Tag model
 class Tag(Base):
     __tablename__ = "tags"
@@ -183,7 +206,7 @@ class Log(Base):
     id = Column(Integer, primary_key=True, index=True)
     event_type = Column(String)  # e.g., "automation_executed", "task_status_changed", etc.
     description = Column(Text)
-    metadata = Column(JSON)
+    event_metadata = Column("metadata", JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Foreign Keys
@@ -213,4 +236,33 @@ class AISuggestion(Base):
     
     # Relationships
     user = relationship("User")
-    project = relationship("Project") 
\ No newline at end of file
+    project = relationship("Project")
+
+# Daily task completion rollup: tasks completed per project owner, project,
+# priority and day. Maintained incrementally by crud.adjust_completion_rollup
+# and rebuilt by scripts/backfill_completion_rollup.py
+class TaskCompletionDaily(Base):
+    __tablename__ = "task_completion_daily"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    priority = Column(Enum(Priority), primary_key=True)
+    day = Column(Date, primary_key=True)
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+
+# Composite indexes for the hot filters in crud.py (ownership scoping,
+# status/date filters, due-date ranges, completion counts) and for the
+# reverse side of the association tables and child collections
+Index("ix_projects_user_id_status", Project.user_id, Project.status)
+Index("ix_tasks_project_id_status_due_date", Task.project_id, Task.status, Task.due_date)
+Index("ix_tasks_project_id_status_updated_at", Task.project_id, Task.status, Task.updated_at)
+Index("ix_tasks_project_id_due_date", Task.project_id, Task.due_date)
+Index("ix_tasks_assignee_id_due_date", Task.assignee_id, Task.due_date)
+Index("ix_task_tags_tag_id_task_id", task_tags.c.tag_id, task_tags.c.task_id)
+Index("ix_project_team_members_user_id_project_id", project_team_members.c.user_id, project_team_members.c.project_id)
+Index("ix_comments_task_id", Comment.task_id)
+Index("ix_attachments_task_id", Attachment.task_id)
+Index("ix_logs_user_id_created_at", Log.user_id, Log.created_at)
+Index("ix_logs_project_id", Log.project_id)
+Index("ix_logs_task_id", Log.task_id)
+Index("ix_task_completion_daily_user_id_day", TaskCompletionDaily.user_id, TaskCompletionDaily.day)
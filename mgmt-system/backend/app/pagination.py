@@ -0,0 +1,164 @@
+"""
+Keyset (cursor) pagination
+--------------------------
+
+A cursor is an opaque token holding the sort key value and id of the last row
+of a page. The next page starts strictly after that (value, id) pair, which
+the (sort key, id) indexes in models.py turn into an index seek, so a deep
+page costs the same as the first one.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Sort keys accepted by each list endpoint, mapped to their SQL expression
+TASK_SORT_KEYS = {
+    "id": models.Task.id,
+    "due_date": models.Task.due_date,
+    "updated_at": models.Task.updated_at,
+    "priority": models.priority_rank(models.Task.priority),
+}
+
+PROJECT_SORT_KEYS = {
+    "id": models.Project.id,
+    "end_date": models.Project.end_date,
+    "updated_at": models.Project.updated_at,
+    "priority": models.priority_rank(models.Project.priority),
+}
+
+PRIORITY_RANKS = {member: rank for rank, member in enumerate(models.Priority)}
+
+# Types a cursor's sort value may have, by sort key (NULL sort values included;
+# "search" is the relevance score of search.py)
+CURSOR_VALUE_TYPES = {
+    "id": (int,),
+    "due_date": (datetime, type(None)),
+    "end_date": (datetime, type(None)),
+    "updated_at": (datetime, type(None)),
+    "priority": (int, type(None)),
+    "search": (int, float),
+}
+
+
+def parse_sort(sort: Optional[str], sort_keys: Dict[str, Any]) -> Tuple[str, bool]:
+    """Split a sort parameter such as "-due_date" into (key, descending)."""
+    sort = sort or "id"
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in sort_keys:
+        raise ValueError(f"Unsupported sort key '{key}', expected one of: {', '.join(sort_keys)}")
+    return key, descending
+
+
+def encode_cursor(sort: str, value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps([sort, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        # The sort value is bound into the page query, so it must have the
+        # type encode_cursor writes for that sort key
+        if isinstance(value, bool) or not isinstance(value, CURSOR_VALUE_TYPES.get(sort.lstrip("-"), ())):
+            raise TypeError(value)
+        if isinstance(row_id, bool) or not isinstance(row_id, int):
+            raise TypeError(row_id)
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, row_id
+
+
+def _sort_value(obj: Any, key: str) -> Any:
+    value = getattr(obj, key)
+    if key == "priority":
+        return PRIORITY_RANKS.get(value)
+    return value
+
+
+def next_cursor(items: List[Any], sort: Optional[str], limit: int) -> Optional[str]:
+    """Cursor for the page after `items`, or None when this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    key = (sort or "id").lstrip("-")
+    return encode_cursor(sort or "id", _sort_value(last, key), last.id)
+
+
+def _bind_value(db: Session, column, value: Any) -> Any:
+    # SQLite keeps datetimes as text. Timestamps written by CURRENT_TIMESTAMP
+    # (server defaults and onupdate=func.now()) have no fractional part while
+    # bound datetimes always do, so compare those columns in their stored form.
+    if isinstance(value, datetime) and db.get_bind().dialect.name == "sqlite":
+        stored = getattr(column, "expression", column)
+        if getattr(stored, "server_default", None) is not None or getattr(stored, "onupdate", None) is not None:
+            return literal(value.isoformat(" "), String)
+    return value
+
+
+def keyset_page(db: Session, query, sort_keys: Dict[str, Any], id_column,
+                sort: Optional[str] = None, cursor: Optional[str] = None,
+                skip: int = 0, limit: int = 100) -> List[Any]:
+    """Fetch one page of `query` ordered by (sort key, id), starting after `cursor`.
+
+    `skip` only applies to the first page; once a cursor is given the page is
+    located by an index seek instead of an OFFSET. NULL sort values stay where
+    the dialect puts them natively (lowest on SQLite, highest on PostgreSQL)
+    so the plain (sort key, id) indexes can serve the ORDER BY, and the block
+    of NULL rows is read with its own seek on id.
+    """
+    key, descending = parse_sort(sort, sort_keys)
+    column = sort_keys[key]
+
+    def direction(expr):
+        return expr.desc() if descending else expr.asc()
+
+    def after(left, right):
+        return left < right if descending else left > right
+
+    if column is id_column:
+        query = query.order_by(direction(id_column))
+        if cursor is None:
+            return query.offset(skip).limit(limit).all()
+        _, last_id = decode_cursor(cursor, sort or "id")
+        return query.filter(after(id_column, last_id)).limit(limit).all()
+
+    ordered = query.order_by(direction(column), direction(id_column))
+    if cursor is None:
+        return ordered.offset(skip).limit(limit).all()
+
+    value, last_id = decode_cursor(cursor, sort or "id")
+    nulls_last = (db.get_bind().dialect.name == "postgresql") != descending
+    null_rows = query.filter(column.is_(None)).order_by(direction(id_column))
+
+    if value is None:
+        # The previous page ended inside the block of NULL sort values
+        items = null_rows.filter(after(id_column, last_id)).limit(limit).all()
+        if not nulls_last and len(items) < limit:
+            items += ordered.filter(column.isnot(None)).limit(limit - len(items)).all()
+        return items
+
+    value = _bind_value(db, column, value)
+    # The redundant single-column bound lets SQLite seek expression indexes,
+    # which it does not do for a row-value comparison alone
+    items = ordered.filter(
+        column <= value if descending else column >= value,
+        after(tuple_(column, id_column), tuple_(value, last_id)),
+    ).limit(limit).all()
+    if nulls_last and len(items) < limit:
+        items += null_rows.limit(limit - len(items)).all()
+    return items
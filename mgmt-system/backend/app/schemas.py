@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr, validator
+from pydantic import BaseModel, Field, EmailStr, validator, root_validator
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime, date
 from enum import Enum
@@ -120,6 +120,46 @@ class TaskUpdate(BaseModel):
 class CommentUpdate(BaseModel):
     content: Optional[str] = None
 
+# Batch schemas
+MAX_TASK_BATCH_SIZE = 5000
+
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+    
+    # Counters and the completion rollup follow these fields, so they may be
+    # left out but not cleared
+    @validator("project_id", "status", "priority", pre=True)
+    def check_not_null(cls, value, field):
+        if value is None:
+            raise ValueError(f"{field.name} may not be null")
+        return value
+
+class TaskBatch(BaseModel):
+    create: List[TaskCreate] = []
+    update: List[TaskBatchUpdate] = []
+    delete: List[int] = []
+    
+    @root_validator(skip_on_failure=True)
+    def check_batch_size(cls, values):
+        size = len(values["create"]) + len(values["update"]) + len(values["delete"])
+        if size > MAX_TASK_BATCH_SIZE:
+            raise ValueError(f"A batch may contain at most {MAX_TASK_BATCH_SIZE} operations")
+        return values
+
+    # Each task's counters and completion rollup are adjusted from its state
+    # before the batch, so a task may only be updated or deleted once
+    @root_validator(skip_on_failure=True)
+    def check_unique_task_ids(cls, values):
+        seen, repeated = set(), []
+        for task_id in [item.id for item in values["update"]] + values["delete"]:
+            if task_id in seen:
+                repeated.append(task_id)
+            seen.add(task_id)
+        if repeated:
+            ids = ", ".join(map(str, dict.fromkeys(repeated)))
+            raise ValueError(f"Tasks may appear only once across update and delete, repeated: {ids}")
+        return values
+
 # Response schemas
 class Tag(TagBase):
     id: int
@@ -161,6 +201,7 @@ class Task(TaskBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
     assignee: Optional[User] = None
     tags: List[Tag] = []
     attachments: List[Attachment] = []
@@ -173,6 +214,8 @@ class Project(ProjectBase):
     id: int
     user_id: int
     completion_percentage: float
+    total_tasks: int = 0
+    done_tasks: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
     owner: User
@@ -203,6 +246,58 @@ class ProjectSummary(BaseModel):
     class Config:
         orm_mode = True
 
+class TaskBatchItemResult(BaseModel):
+    op: str  # "create", "update" or "delete"
+    index: int  # Position of the item in its list of the request
+    id: Optional[int] = None
+    ok: bool = True
+    error: Optional[str] = None
+
+class TaskBatchResult(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    results: List[TaskBatchItemResult]
+
+# Import schemas
+# One row of an import file. The columns match the exports, so an export can
+# be imported again (columns not listed here, like id, are ignored), and
+# projects and assignees may be referenced by name instead of id.
+class TaskImportRow(TaskBase):
+    project_id: Optional[int] = None
+    project_name: Optional[str] = None
+    assignee_username: Optional[str] = None
+    assignee_email: Optional[str] = None
+    
+    @root_validator(skip_on_failure=True)
+    def check_project(cls, values):
+        if values["project_id"] is None and not values["project_name"]:
+            raise ValueError("project_id or project_name is required")
+        return values
+
+class ProjectImportRow(ProjectBase):
+    team: List[str] = []  # Usernames
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based position of the row in the file, not counting the CSV header
+    error: str
+
+class ImportResult(BaseModel):
+    received: int
+    created: int
+    failed: int
+    errors: List[ImportRowError]  # The first IMPORT_MAX_ERRORS failures
+
+# Search schemas
+class SearchResult(BaseModel):
+    type: str  # "task", "project" or "comment"
+    id: int
+    project_id: int
+    task_id: Optional[int] = None  # The task itself, or the task commented on
+    title: Optional[str] = None  # Task title or project name
+    excerpt: Optional[str] = None
+    score: float
+
 # Token schemas
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,138 @@
+"""
+Full-text search
+----------------
+
+Statements behind GET /api/search, over the index built by migration 0005:
+an FTS5 table on SQLite, generated tsvector columns on PostgreSQL. Both are
+kept current by the database on every write.
+
+Results are "documents" (tasks, projects and comments) identified by
+doc = id * 4 + kind, as in the SQLite index. They are ranked by score,
+higher is better, and paged with a cursor on (score, doc). Only documents
+in projects the user owns are searched.
+
+The search text is reduced to its words. Every word must match, the last
+one as a prefix, so results narrow as the user types.
+"""
+
+import re
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, cast, column, func, literal_column, or_, select, table, union_all
+from sqlalchemy.orm import aliased
+
+from . import models
+from .pagination import decode_cursor, encode_cursor
+
+TASK, PROJECT, COMMENT = 1, 2, 3
+SEARCH_KINDS = {TASK: "task", PROJECT: "project", COMMENT: "comment"}
+MAX_SEARCH_TERMS = 16
+EXCERPT_LENGTH = 200
+
+# Column weights for SQLite's bm25(): owner (never searched), title, body
+SQLITE_WEIGHTS = (0.0, 4.0, 1.0)
+
+search_index = table("search_index", column("rowid"))
+
+
+def search_terms(q: str) -> List[str]:
+    return re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+
+
+def _sqlite_hits(user_id: int, terms: List[str]):
+    # Every term quoted (they are \w+, so they need no escaping), the owner
+    # token scopes the match to the user inside the index
+    phrases = " AND ".join(f'"{term}"' for term in terms) + "*"
+    match = f"owner:u{user_id} AND {{title body}} : ({phrases})"
+    index = literal_column("search_index")
+    return select(
+        search_index.c.rowid.label("doc"),
+        (-func.bm25(index, *SQLITE_WEIGHTS)).label("score"),
+    ).where(index.op("MATCH")(match))
+
+
+def _postgres_hits(user_id: int, terms: List[str]):
+    query = func.to_tsquery("english", " & ".join(terms) + ":*")
+
+    def matches(model, kind, *joins):
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        # ts_rank() is a real; as a double it survives the trip through a
+        # cursor unchanged, so ties compare equal on the next page
+        statement = select(
+            (model.id * 4 + kind).label("doc"),
+            cast(func.ts_rank(vector, query), Float).label("score"),
+        )
+        for target, condition in joins:
+            statement = statement.join(target, condition)
+        return statement.where(models.Project.user_id == user_id, vector.op("@@")(query))
+
+    return union_all(
+        matches(models.Task, TASK, (models.Project, models.Project.id == models.Task.project_id)),
+        matches(models.Project, PROJECT),
+        matches(
+            models.Comment, COMMENT,
+            (models.Task, models.Task.id == models.Comment.task_id),
+            (models.Project, models.Project.id == models.Task.project_id),
+        ),
+    )
+
+
+def search_statement(dialect: str, user_id: int, terms: List[str], limit: int,
+                     after: Optional[Tuple[float, int]] = None):
+    """One page of ranked documents, with what a result list shows of them."""
+    hits = (_postgres_hits if dialect == "postgresql" else _sqlite_hits)(user_id, terms).subquery("hits")
+    page = select(hits.c.doc, hits.c.score)
+    if after is not None:
+        score, doc = after
+        page = page.where(or_(hits.c.score < score, and_(hits.c.score == score, hits.c.doc > doc)))
+    page = page.order_by(hits.c.score.desc(), hits.c.doc).limit(limit).subquery("page")
+
+    # Only the page's documents are looked up, each by primary key
+    kind, ref = page.c.doc % 4, page.c.doc // 4
+    comment_task = aliased(models.Task)
+    return (
+        select(
+            page.c.doc,
+            page.c.score,
+            func.coalesce(models.Task.project_id, models.Project.id, comment_task.project_id).label("project_id"),
+            func.coalesce(models.Task.id, models.Comment.task_id).label("task_id"),
+            func.coalesce(models.Task.title, models.Project.name, comment_task.title).label("title"),
+            func.substr(
+                func.coalesce(models.Task.description, models.Project.description, models.Comment.content),
+                1, EXCERPT_LENGTH,
+            ).label("excerpt"),
+        )
+        .select_from(page)
+        .outerjoin(models.Task, and_(kind == TASK, models.Task.id == ref))
+        .outerjoin(models.Project, and_(kind == PROJECT, models.Project.id == ref))
+        .outerjoin(models.Comment, and_(kind == COMMENT, models.Comment.id == ref))
+        .outerjoin(comment_task, comment_task.id == models.Comment.task_id)
+        .order_by(page.c.score.desc(), page.c.doc)
+    )
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    return decode_cursor(cursor, "search")
+
+
+def search_cursor(results: List[dict], limit: int) -> Optional[str]:
+    """Cursor for the page after `results`, or None when this was the last page."""
+    if not results or len(results) < limit:
+        return None
+    last = results[-1]
+    return encode_cursor("search", last["score"], last["id"] * 4 + _kind_codes[last["type"]])
+
+
+_kind_codes = {name: kind for kind, name in SEARCH_KINDS.items()}
+
+
+def search_result(row: Any) -> dict:
+    return {
+        "type": SEARCH_KINDS[row.doc % 4],
+        "id": row.doc // 4,
+        "project_id": row.project_id,
+        "task_id": row.task_id,
+        "title": row.title,
+        "excerpt": row.excerpt,
+        "score": row.score,
+    }
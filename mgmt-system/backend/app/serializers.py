@@ -0,0 +1,196 @@
+"""
+Response serializers for the hot read paths
+-------------------------------------------
+
+Build the JSON-ready dicts of schemas.Task / schemas.Project straight from
+loaded ORM rows, skipping pydantic's orm_mode validation of every nested
+object. The output has the response schemas' fields, in their order, and
+is meant for ORJSONResponse, which encodes datetimes and enums natively.
+
+These mirror the response schemas in schemas.py and must be kept in step
+with them; the response_model on each route still documents the shape.
+
+The read routes also accept sparse fieldsets (`fields=` / `include=`),
+parsed by parse_fieldset() and rendered by serialize_fieldset().
+"""
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+def serialize_user(user) -> dict:
+    return {
+        "email": user.email,
+        "username": user.username,
+        "full_name": user.full_name,
+        "id": user.id,
+        "is_active": user.is_active,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+    }
+
+
+def serialize_tag(tag) -> dict:
+    return {
+        "name": tag.name,
+        "color": tag.color,
+        "id": tag.id,
+        "created_at": tag.created_at,
+    }
+
+
+def serialize_comment(comment) -> dict:
+    return {
+        "content": comment.content,
+        "task_id": comment.task_id,
+        "id": comment.id,
+        "user_id": comment.user_id,
+        "created_at": comment.created_at,
+        "updated_at": comment.updated_at,
+        "user": serialize_user(comment.user),
+    }
+
+
+def serialize_attachment(attachment) -> dict:
+    return {
+        "filename": attachment.filename,
+        "file_type": attachment.file_type,
+        "task_id": attachment.task_id,
+        "id": attachment.id,
+        "user_id": attachment.user_id,
+        "file_path": attachment.file_path,
+        "file_size": attachment.file_size,
+        "created_at": attachment.created_at,
+    }
+
+
+def serialize_task(task, fieldset: Optional["Fieldset"] = None) -> dict:
+    if fieldset is not None:
+        return serialize_fieldset(task, fieldset, TASK_RELATIONS)
+    assignee = task.assignee
+    return {
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+        "priority": task.priority,
+        "due_date": task.due_date,
+        "estimated_hours": task.estimated_hours,
+        "actual_hours": task.actual_hours,
+        "project_id": task.project_id,
+        "assignee_id": task.assignee_id,
+        "tags": [serialize_tag(tag) for tag in task.tags],
+        "id": task.id,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "completed_at": task.completed_at,
+        "assignee": serialize_user(assignee) if assignee is not None else None,
+        "attachments": [serialize_attachment(attachment) for attachment in task.attachments],
+        "comments": [serialize_comment(comment) for comment in task.comments],
+    }
+
+
+def serialize_project(project, fieldset: Optional["Fieldset"] = None) -> dict:
+    if fieldset is not None:
+        return serialize_fieldset(project, fieldset, PROJECT_RELATIONS)
+    return {
+        "name": project.name,
+        "description": project.description,
+        "category": project.category,
+        "status": project.status,
+        "start_date": project.start_date,
+        "end_date": project.end_date,
+        "budget": project.budget,
+        "expenses": project.expenses,
+        "priority": project.priority,
+        "id": project.id,
+        "user_id": project.user_id,
+        "completion_percentage": project.completion_percentage,
+        "total_tasks": project.total_tasks,
+        "done_tasks": project.done_tasks,
+        "created_at": project.created_at,
+        "updated_at": project.updated_at,
+        "owner": serialize_user(project.owner),
+        "team": [serialize_user(member) for member in project.team],
+        "tasks": [serialize_task(task) for task in project.tasks],
+    }
+
+
+def serialize_tasks(tasks: Iterable, fieldset: Optional["Fieldset"] = None) -> List[dict]:
+    return [serialize_task(task, fieldset) for task in tasks]
+
+
+def serialize_projects(projects: Iterable, fieldset: Optional["Fieldset"] = None) -> List[dict]:
+    return [serialize_project(project, fieldset) for project in projects]
+
+
+def serialize_rows(rows: Iterable) -> List[dict]:
+    """Column projections (the summary endpoints) as dicts, in select order."""
+    return [row._asdict() for row in rows]
+
+
+# Sparse fieldsets
+# Scalar fields and embedded relations each response can be narrowed to,
+# in schema order
+TASK_FIELDS = (
+    "id", "title", "description", "status", "priority", "due_date", "estimated_hours",
+    "actual_hours", "project_id", "assignee_id", "created_at", "updated_at", "completed_at",
+)
+
+TASK_RELATIONS: Dict[str, Callable] = {
+    "assignee": lambda assignee: serialize_user(assignee) if assignee is not None else None,
+    "tags": lambda tags: [serialize_tag(tag) for tag in tags],
+    "attachments": lambda attachments: [serialize_attachment(attachment) for attachment in attachments],
+    "comments": lambda comments: [serialize_comment(comment) for comment in comments],
+}
+
+PROJECT_FIELDS = (
+    "id", "name", "description", "category", "status", "start_date", "end_date", "budget",
+    "expenses", "priority", "user_id", "completion_percentage", "total_tasks", "done_tasks",
+    "created_at", "updated_at",
+)
+
+PROJECT_RELATIONS: Dict[str, Callable] = {
+    "owner": serialize_user,
+    "team": lambda team: [serialize_user(member) for member in team],
+    "tasks": serialize_tasks,
+}
+
+
+class Fieldset(NamedTuple):
+    fields: Tuple[str, ...]  # Scalar fields, always including "id"
+    include: Tuple[str, ...]  # Embedded relations
+
+
+def _names(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def parse_fieldset(fields: Optional[str], include: Optional[str],
+                   scalar_fields: Tuple[str, ...], relations: Dict[str, Callable]) -> Optional[Fieldset]:
+    """The fieldset asked for by `fields=` and `include=`, None for the full response.
+    
+    `fields` narrows the scalar fields (all of them if omitted) and drops the
+    relations not listed in `include` or in `fields` itself; `include` alone
+    keeps every scalar field and embeds only the listed relations. Raises
+    ValueError for unknown names.
+    """
+    if fields is None and include is None:
+        return None
+    
+    requested = _names(fields) if fields is not None else list(scalar_fields)
+    included = _names(include) if include is not None else []
+    included += [name for name in requested if name in relations]
+    unknown = [name for name in requested if name not in scalar_fields and name not in relations]
+    unknown += [name for name in included if name not in relations]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return Fieldset(
+        fields=tuple(name for name in scalar_fields if name == "id" or name in requested),
+        include=tuple(name for name in relations if name in included),
+    )
+
+
+def serialize_fieldset(obj, fieldset: Fieldset, relations: Dict[str, Callable]) -> dict:
+    data = {name: getattr(obj, name) for name in fieldset.fields}
+    for name in fieldset.include:
+        data[name] = relations[name](getattr(obj, name))
+    return data
@@ -0,0 +1,132 @@
+"""
+Sync vs async database layer throughput
+---------------------------------------
+
+Starts the API under uvicorn twice against the same seeded database, once
+with the threadpool-backed sync sessions and once with ASYNC_DB=true, and
+drives each with the same number of concurrent clients. Reports requests
+per second and latency percentiles for both.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/async_throughput.py [--clients 500] [--seconds 15] [--path /api/tasks/?limit=20]
+
+By default a temporary SQLite database is used; set DATABASE_URL to
+benchmark PostgreSQL (the async run then uses asyncpg).
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import BACKEND_DIR, latency_line, migrate, use_scratch_database
+
+use_scratch_database("async_throughput")
+
+import httpx
+
+PASSWORD = "bench-password"
+
+
+async def seed(base_url, tasks):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        await client.post("/api/auth/register", json={
+            "email": "bench@example.com", "username": "bench", "password": PASSWORD,
+        })
+        response = await client.post("/api/auth/token", data={"username": "bench", "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        now = datetime.now()
+        project = await client.post("/api/projects/", headers=headers, json={
+            "name": "Bench", "category": "bench",
+            "start_date": now.isoformat(), "end_date": (now + timedelta(days=90)).isoformat(),
+        })
+        project_id = project.json()["id"]
+        batch = [
+            {"title": f"Task {i}", "project_id": project_id, "due_date": (now + timedelta(days=i % 60)).isoformat(), "tags": [f"tag{i % 5}"]}
+            for i in range(tasks)
+        ]
+        response = await client.post("/api/tasks/batch", headers=headers, json={"create": batch}, timeout=120)
+        response.raise_for_status()
+        return headers
+
+
+def start_server(port, async_db):
+    env = dict(os.environ, ASYNC_DB="true" if async_db else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+async def wait_until_up(base_url):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                await client.get("/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def load(base_url, headers, path, clients, seconds):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(clients)))
+    return latencies, errors
+
+
+async def run(args):
+    headers = None
+    for label, async_db, port in (("sync", False, 8765), ("async", True, 8766)):
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(port, async_db)
+        try:
+            await wait_until_up(base_url)
+            if headers is None:
+                headers = await seed(base_url, args.tasks)
+            latencies, errors = await load(base_url, headers, args.path, args.clients, args.seconds)
+        finally:
+            server.terminate()
+            server.wait()
+
+        print(f"{label}: {len(latencies) / args.seconds:8.1f} req/s, {errors} errors")
+        if latencies:
+            print(latency_line(f"  {label}", latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--clients", type=int, default=500, help="concurrent clients")
+    parser.add_argument("--seconds", type=float, default=15, help="duration of each run")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks to seed")
+    parser.add_argument("--path", default="/api/tasks/?limit=20", help="endpoint to request")
+    args = parser.parse_args()
+
+    migrate()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Shared benchmark helpers: a migrated scratch database and latency stats.
+
+Import this before anything from `app`, and call use_scratch_database()
+before importing the application, since the engine reads DATABASE_URL at
+import time.
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def use_scratch_database(name):
+    """Point DATABASE_URL at a temporary SQLite file unless it is already set."""
+    if not os.getenv("DATABASE_URL"):
+        scratch = os.path.join(tempfile.mkdtemp(), f"{name}.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{scratch}"
+    return os.environ["DATABASE_URL"]
+
+
+def migrate():
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def latency_line(label, samples):
+    ordered = sorted(samples)
+    return (
+        f"{label:<12} p50 {percentile(ordered, 0.5) * 1000:7.1f} ms   "
+        f"p99 {percentile(ordered, 0.99) * 1000:7.1f} ms   max {ordered[-1] * 1000:7.1f} ms"
+    )
@@ -0,0 +1,146 @@
+"""
+Database concurrency benchmark
+------------------------------
+
+Runs writer threads (task creates and status updates through crud.py) next
+to reader threads (crud.get_tasks) against one engine, and reports
+throughput, latency and "database is locked" errors for each SQLite
+connection profile (see SQLITE_PROFILE in app/database.py). Every profile
+gets a fresh scratch database, since journal_mode=WAL sticks to the file.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/db_concurrency.py [--writers 4] [--readers 8] [--seconds 5]
+
+With DATABASE_URL pointing at a server database the workload runs once
+against it, using the DB_POOL_* settings as in production.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from common import latency_line
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.database import Base, create_app_engine
+
+
+def seed(Session):
+    db = Session()
+    user = crud.create_user(db, schemas.UserCreate(
+        email="bench@example.com", username="bench", password="x"
+    ), hashed_password="x")
+    project = crud.create_project(db, schemas.ProjectCreate(
+        name="Bench", category="bench",
+        start_date=datetime.now(), end_date=datetime.now() + timedelta(days=30),
+    ), user_id=user.id)
+    user_id, project_id = user.id, project.id
+    db.close()
+    return user_id, project_id
+
+
+def writer(Session, project_id, deadline, stats):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        db = Session()
+        try:
+            task = crud.create_task(db, schemas.TaskCreate(
+                title="Bench", project_id=project_id, due_date=datetime.now(),
+            ))
+            crud.update_task(db, task.id, schemas.TaskUpdate(status=models.TaskStatus.DONE))
+            stats.record("write", time.perf_counter() - start)
+        except OperationalError as e:
+            stats.fail("write", e)
+        finally:
+            db.close()
+
+
+def reader(Session, user_id, project_id, deadline, stats):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        db = Session()
+        try:
+            crud.get_tasks(db, user_id=user_id, project_id=project_id, limit=50)
+            stats.record("read", time.perf_counter() - start)
+        except OperationalError as e:
+            stats.fail("read", e)
+        finally:
+            db.close()
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {"write": [], "read": []}
+        self.locked = {"write": 0, "read": 0}
+        self.errors = {"write": 0, "read": 0}
+
+    def record(self, kind, elapsed):
+        with self.lock:
+            self.latencies[kind].append(elapsed)
+
+    def fail(self, kind, error):
+        with self.lock:
+            if "database is locked" in str(error):
+                self.locked[kind] += 1
+            else:
+                self.errors[kind] += 1
+
+
+def run(url, profile, writers, readers, seconds):
+    engine = create_app_engine(url, sqlite_profile=profile)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    user_id, project_id = seed(Session)
+
+    stats = Stats()
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=writer, args=(Session, project_id, deadline, stats))
+        for _ in range(writers)
+    ] + [
+        threading.Thread(target=reader, args=(Session, user_id, project_id, deadline, stats))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(f"== {profile}")
+    for kind in ("write", "read"):
+        samples = stats.latencies[kind]
+        line = f"{kind:<6} {len(samples) / seconds:8.1f} ops/s   locked {stats.locked[kind]:4}   other errors {stats.errors[kind]:4}"
+        print(line)
+        if samples:
+            print("       " + latency_line(kind, samples))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    url = os.getenv("DATABASE_URL")
+    if url and make_url(url).get_backend_name() != "sqlite":
+        run(url, "server", args.writers, args.readers, args.seconds)
+        return
+
+    for profile in ("default", "performance"):
+        scratch = os.path.join(tempfile.mkdtemp(), f"db_concurrency_{profile}.db")
+        run(f"sqlite:///{scratch}", profile, args.writers, args.readers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
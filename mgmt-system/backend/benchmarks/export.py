@@ -0,0 +1,166 @@
+"""
+Streaming export benchmark
+--------------------------
+
+Seeds one user with a large number of tasks (inserted in bulk through
+SQLAlchemy Core, with tags and an assignee), starts the API under uvicorn
+and downloads /api/export/tasks as NDJSON and as CSV. Reports rows per
+second, bytes sent and the server's peak RSS before and after each export,
+which should stay flat however many rows are exported.
+
+With the default "performance" SQLite profile, peak RSS also counts the
+database pages SQLite maps in (SQLITE_MMAP_SIZE, 256 MiB) and fills into
+its page cache (SQLITE_CACHE_SIZE_KB, 64 MiB) as it reads; the "heap"
+figure is the server's largest anonymous RSS during the export. Run with
+SQLITE_PROFILE=default to see the export's own footprint.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/export.py [--tasks 1000000] [--projects 100] [--async-db]
+
+By default a temporary SQLite database is used; set DATABASE_URL to
+benchmark another (migrated, empty) database. Peak RSS is read from
+/proc, so the benchmark needs Linux.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import BACKEND_DIR, migrate, use_scratch_database
+
+use_scratch_database("export")
+
+import httpx
+from sqlalchemy import insert, select
+
+from app import models
+from app.database import engine
+
+PASSWORD = "bench-password"
+PORT = 8767
+
+
+def seed(user_id, tasks, projects):
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Tag), [{"name": f"export-tag-{i}"} for i in range(20)])
+        tag_ids = conn.execute(select(models.Tag.id).order_by(models.Tag.id)).scalars().all()
+        conn.execute(insert(models.Project), [
+            {"name": f"Project {p}", "category": "bench", "user_id": user_id,
+             "start_date": now, "end_date": now + timedelta(days=90)}
+            for p in range(projects)
+        ])
+        project_ids = conn.execute(
+            select(models.Project.id).where(models.Project.user_id == user_id).order_by(models.Project.id)
+        ).scalars().all()
+
+    statuses, priorities = list(models.TaskStatus), list(models.Priority)
+    chunk = 20000
+    for start in range(0, tasks, chunk):
+        with engine.begin() as conn:
+            first_id = conn.execute(select(models.Task.id).order_by(models.Task.id.desc()).limit(1)).scalar() or 0
+            rows = [
+                {"title": f"Task {i}", "description": "Exported task", "project_id": project_ids[i % len(project_ids)],
+                 "status": statuses[i % 4], "priority": priorities[i % 4], "due_date": now + timedelta(days=i % 60),
+                 "assignee_id": user_id if i % 2 else None, "created_at": now}
+                for i in range(start, min(start + chunk, tasks))
+            ]
+            conn.execute(insert(models.Task), rows)
+            conn.execute(insert(models.task_tags), [
+                {"task_id": first_id + 1 + n, "tag_id": tag_ids[(first_id + n + k) % len(tag_ids)]}
+                for n in range(len(rows)) for k in range(2)
+            ])
+        print(f"\rseeded {min(start + chunk, tasks)} tasks", end="", flush=True)
+    print()
+
+
+def memory_mib(pid, field):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def start_server(async_db):
+    env = dict(os.environ, ASYNC_DB="true" if async_db else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+async def wait_until_up(client):
+    for _ in range(100):
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+async def login(client):
+    await client.post("/api/auth/register", json={
+        "email": "export@example.com", "username": "export", "password": PASSWORD,
+    })
+    response = await client.post("/api/auth/token", data={"username": "export", "password": PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def download(client, headers, format, pid):
+    rows = size = 0
+    heap = memory_mib(pid, "RssAnon")
+    start = time.perf_counter()
+    async with client.stream("GET", "/api/export/tasks", params={"format": format}, headers=headers) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            rows += chunk.count(b"\n")
+            heap = max(heap, memory_mib(pid, "RssAnon"))
+    elapsed = time.perf_counter() - start
+    # The CSV header is a line too
+    return rows - (format == "csv"), size, elapsed, heap
+
+
+async def run(args):
+    server = start_server(args.async_db)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=None) as client:
+            await wait_until_up(client)
+            headers = await login(client)
+            me = await client.get("/api/auth/me", headers=headers)
+            seed(me.json()["id"], args.tasks, args.projects)
+
+            for format in ("ndjson", "csv"):
+                before = memory_mib(server.pid, "VmHWM")
+                rows, size, elapsed, heap = await download(client, headers, format, server.pid)
+                after = memory_mib(server.pid, "VmHWM")
+                print(
+                    f"{format:<7} {rows:9d} rows in {elapsed:6.1f} s  {rows / elapsed:9.0f} rows/s  "
+                    f"{size / 2 ** 20:7.0f} MiB   server peak RSS {before:6.0f} -> {after:6.0f} MiB"
+                    f"  (heap {heap:5.0f} MiB)"
+                )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--tasks", type=int, default=1000000, help="tasks to seed")
+    parser.add_argument("--projects", type=int, default=100, help="projects to spread them over")
+    parser.add_argument("--async-db", action="store_true", help="run the server with ASYNC_DB=true")
+    args = parser.parse_args()
+
+    migrate()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Bulk import benchmark
+---------------------
+
+Starts the API under uvicorn and imports the same generated tasks (with
+tags, an assignee by username and a project by name) through
+POST /api/import as a streamed NDJSON and a streamed CSV upload, then
+creates a sample of them one POST /api/tasks/ call at a time for
+comparison. Reports rows per second for each.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/import_throughput.py [--rows 100000] [--single 500] [--async-db]
+
+By default a temporary SQLite database is used; set DATABASE_URL to
+benchmark another (migrated, empty) database.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import BACKEND_DIR, migrate, use_scratch_database
+
+use_scratch_database("import_throughput")
+
+import httpx
+import orjson
+
+PASSWORD = "bench-password"
+PORT = 8768
+COLUMNS = ["title", "description", "status", "priority", "due_date", "estimated_hours",
+           "project_name", "assignee_username", "tags"]
+
+
+def generate(rows):
+    now = datetime.now()
+    statuses, priorities = ["todo", "in-progress", "review", "done"], ["low", "medium", "high", "urgent"]
+    for i in range(rows):
+        yield {
+            "title": f"Imported task {i}",
+            "description": "Imported from another tool",
+            "status": statuses[i % 4],
+            "priority": priorities[i % 4],
+            "due_date": (now + timedelta(days=i % 90)).isoformat(),
+            "estimated_hours": i % 8,
+            "project_name": f"Import {i % 10}",
+            "assignee_username": "importer",
+            "tags": [f"import-{i % 50}", f"team-{i % 7}"],
+        }
+
+
+async def ndjson_body(rows, chunk=1000):
+    lines = []
+    for row in generate(rows):
+        lines.append(orjson.dumps(row))
+        if len(lines) == chunk:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+async def csv_body(rows, chunk=1000):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for i, row in enumerate(generate(rows), 1):
+        writer.writerow([("|".join(row[name]) if name == "tags" else row[name]) for name in COLUMNS])
+        if i % chunk == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def start_server(async_db):
+    env = dict(os.environ, ASYNC_DB="true" if async_db else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+async def wait_until_up(client):
+    for _ in range(100):
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+async def setup(client):
+    await client.post("/api/auth/register", json={
+        "email": "importer@example.com", "username": "importer", "password": PASSWORD,
+    })
+    response = await client.post("/api/auth/token", data={"username": "importer", "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    now = datetime.now()
+    project_ids = []
+    for p in range(10):
+        response = await client.post("/api/projects/", headers=headers, json={
+            "name": f"Import {p}", "category": "bench",
+            "start_date": now.isoformat(), "end_date": (now + timedelta(days=90)).isoformat(),
+        })
+        project_ids.append(response.json()["id"])
+    me = await client.get("/api/auth/me", headers=headers)
+    return headers, project_ids, me.json()["id"]
+
+
+async def timed_import(client, headers, format, body):
+    start = time.perf_counter()
+    response = await client.post("/api/import", params={"format": format}, headers=headers, content=body)
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    result = response.json()
+    assert result["failed"] == 0, result["errors"][:5]
+    return result["created"], elapsed
+
+
+async def single_creates(client, headers, project_ids, user_id, rows):
+    start = time.perf_counter()
+    for i, row in enumerate(generate(rows)):
+        payload = {key: value for key, value in row.items() if key not in ("project_name", "assignee_username")}
+        payload.update(project_id=project_ids[i % 10], assignee_id=user_id)
+        response = await client.post("/api/tasks/", headers=headers, json=payload)
+        response.raise_for_status()
+    return rows, time.perf_counter() - start
+
+
+async def run(args):
+    server = start_server(args.async_db)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=None) as client:
+            await wait_until_up(client)
+            headers, project_ids, user_id = await setup(client)
+
+            for label, body in (("ndjson", ndjson_body(args.rows)), ("csv", csv_body(args.rows))):
+                created, elapsed = await timed_import(client, headers, label, body)
+                print(f"import {label:<7} {created:8d} rows in {elapsed:6.1f} s  {created / elapsed:9.0f} rows/s")
+            created, elapsed = await single_creates(client, headers, project_ids, user_id, args.single)
+            print(f"POST /api/tasks/ {created:6d} rows in {elapsed:6.1f} s  {created / elapsed:9.0f} rows/s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, default=100000, help="rows per import")
+    parser.add_argument("--single", type=int, default=500, help="rows created one request at a time")
+    parser.add_argument("--async-db", action="store_true", help="run the server with ASYNC_DB=true")
+    args = parser.parse_args()
+
+    migrate()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Login storm benchmark
+---------------------
+
+Fires a burst of concurrent logins at the API while a probe client keeps
+requesting a cheap authenticated endpoint, and reports the probe latency
+(p50/p99) with and without the storm. Blocking bcrypt on the event loop
+shows up as probe p99 in the hundreds of milliseconds.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/login_storm.py [--logins 100] [--probes 200]
+
+By default a temporary SQLite database is used; set DATABASE_URL to run it
+against another (migrated) database. BCRYPT_ROUNDS and
+PASSWORD_HASH_WORKERS apply as in production.
+"""
+
+import argparse
+import asyncio
+import time
+
+from common import latency_line, migrate, use_scratch_database
+
+use_scratch_database("login_storm")
+
+import httpx
+
+from app.main import app
+
+PASSWORD = "storm-password"
+
+
+async def register_and_login(client, username):
+    response = await client.post("/api/auth/register", json={
+        "email": f"{username}@example.com", "username": username, "password": PASSWORD,
+    })
+    response.raise_for_status()
+    return await login(client, username)
+
+
+async def login(client, username):
+    response = await client.post("/api/auth/token", data={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def probe(client, headers, count, latencies):
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get("/api/projects/summary", headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.001)
+
+
+async def run(logins, probes):
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        headers = {"Authorization": f"Bearer {await register_and_login(client, 'probe')}"}
+        await register_and_login(client, "storm")
+
+        idle = []
+        await probe(client, headers, probes, idle)
+
+        during = []
+        start = time.perf_counter()
+        storm = asyncio.gather(*(login(client, "storm") for _ in range(logins)))
+        await asyncio.gather(probe(client, headers, probes, during), storm)
+        storm_seconds = time.perf_counter() - start
+
+    print(latency_line("idle", idle))
+    print(latency_line("login storm", during))
+    print(f"{logins} logins finished in {storm_seconds:.2f} s ({logins / storm_seconds:.1f}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--logins", type=int, default=100, help="concurrent logins in the storm")
+    parser.add_argument("--probes", type=int, default=200, help="probe requests per phase")
+    args = parser.parse_args()
+
+    migrate()
+    asyncio.run(run(args.logins, args.probes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Search latency benchmark
+------------------------
+
+Seeds several users with a large number of tasks and comments (inserted in
+bulk through SQLAlchemy Core, so the search index is filled by the same
+triggers that keep it current on every write), starts the API under
+uvicorn and times GET /api/search for one of the users: a selective word,
+a common word, two words, a type-ahead prefix and the page after the first
+(by cursor). Reports p50 / p99 / max latency for each.
+
+Titles and descriptions draw from a small vocabulary, so common words match
+a large share of a user's documents and have all of them ranked; the "ref"
+words match a few dozen documents each.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/search_latency.py [--tasks 800000] [--comments 200000] [--users 10]
+                                        [--requests 200] [--async-db]
+
+By default a temporary SQLite database is used; set DATABASE_URL to
+benchmark another (migrated, empty) database.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import BACKEND_DIR, latency_line, migrate, use_scratch_database
+
+use_scratch_database("search_latency")
+
+import httpx
+from sqlalchemy import func, insert, select
+
+from app import models
+from app.database import engine
+from app.auth import get_password_hash
+
+PASSWORD = "bench-password"
+PORT = 8769
+PROJECTS_PER_USER = 20
+REFS = 5000
+WORDS = [
+    "deploy", "review", "invoice", "login", "database", "migration", "design", "customer",
+    "report", "release", "budget", "contract", "onboarding", "search", "payment", "schedule",
+    "backup", "meeting", "feedback", "roadmap", "security", "testing", "analytics", "support",
+    "hiring", "marketing", "shipping", "inventory", "translation", "accessibility",
+]
+
+
+def text(i, words):
+    picked = [WORDS[(i * 7 + k * 13) % len(WORDS)] for k in range(words)]
+    return f"{' '.join(picked)} ref{i % REFS}"
+
+
+def seed(users, tasks, comments):
+    now = datetime.now()
+    hashed_password = get_password_hash(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"search{u}@example.com", "username": f"search{u}", "hashed_password": hashed_password}
+            for u in range(users)
+        ])
+        user_ids = conn.execute(select(models.User.id).order_by(models.User.id)).scalars().all()
+        conn.execute(insert(models.Project), [
+            {"name": f"{text(p, 2)} project", "description": text(p * 3, 6), "category": "bench",
+             "user_id": user_id, "start_date": now, "end_date": now + timedelta(days=90)}
+            for user_id in user_ids for p in range(PROJECTS_PER_USER)
+        ])
+        project_ids = conn.execute(select(models.Project.id).order_by(models.Project.id)).scalars().all()
+
+    chunk = 20000
+    start_time = time.perf_counter()
+    for start in range(0, tasks, chunk):
+        with engine.begin() as conn:
+            conn.execute(insert(models.Task), [
+                {"title": text(i, 3), "description": text(i * 5, 12), "project_id": project_ids[i % len(project_ids)],
+                 "due_date": now + timedelta(days=i % 60), "created_at": now}
+                for i in range(start, min(start + chunk, tasks))
+            ])
+        print(f"\rseeded {min(start + chunk, tasks)} tasks", end="", flush=True)
+
+    with engine.connect() as conn:
+        first_task, last_task = conn.execute(select(func.min(models.Task.id), func.max(models.Task.id))).one()
+    for start in range(0, comments, chunk):
+        with engine.begin() as conn:
+            conn.execute(insert(models.Comment), [
+                {"content": text(i * 11, 10), "task_id": first_task + i % (last_task - first_task + 1),
+                 "user_id": user_ids[0], "created_at": now}
+                for i in range(start, min(start + chunk, comments))
+            ])
+        print(f"\rseeded {min(start + chunk, comments)} comments", end="", flush=True)
+    elapsed = time.perf_counter() - start_time
+    print(f"\rseeded {tasks} tasks and {comments} comments in {elapsed:.0f} s "
+          f"({(tasks + comments) / elapsed:.0f} indexed rows/s)")
+
+
+def start_server(async_db):
+    env = dict(os.environ, ASYNC_DB="true" if async_db else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+async def wait_until_up(client):
+    for _ in range(100):
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+async def timed(client, headers, queries, requests, next_page=False):
+    samples, hits = [], 0
+    for n in range(requests):
+        params = {"q": queries(n)}
+        if next_page:
+            response = await client.get("/api/search", params=params, headers=headers)
+            params["cursor"] = response.headers["X-Next-Cursor"]
+        start = time.perf_counter()
+        response = await client.get("/api/search", params=params, headers=headers)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+        hits += len(response.json())
+    return samples, hits / requests
+
+
+async def run(args):
+    server = start_server(args.async_db)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=None) as client:
+            await wait_until_up(client)
+            response = await client.post("/api/auth/token", data={"username": "search0", "password": PASSWORD})
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            rng = random.Random(0)
+            cases = {
+                "selective": lambda n: f"ref{rng.randrange(REFS)}",
+                "common": lambda n: rng.choice(WORDS),
+                "two words": lambda n: f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+                "prefix": lambda n: rng.choice(WORDS)[:3],
+            }
+            for label, queries in cases.items():
+                samples, hits = await timed(client, headers, queries, args.requests)
+                print(f"{latency_line(label, samples)}   {hits:5.1f} results")
+            samples, hits = await timed(client, headers, cases["common"], args.requests, next_page=True)
+            print(f"{latency_line('next page', samples)}   {hits:5.1f} results")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--tasks", type=int, default=800000, help="tasks to seed, over all users")
+    parser.add_argument("--comments", type=int, default=200000, help="comments to seed, over all users")
+    parser.add_argument("--users", type=int, default=10, help="users to spread them over")
+    parser.add_argument("--requests", type=int, default=200, help="requests per query kind")
+    parser.add_argument("--async-db", action="store_true", help="run the server with ASYNC_DB=true")
+    args = parser.parse_args()
+
+    migrate()
+    seed(args.users, args.tasks, args.comments)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
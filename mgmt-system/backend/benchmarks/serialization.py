@@ -0,0 +1,114 @@
+"""
+Response serialization benchmark
+--------------------------------
+
+Loads large task and project lists through crud.py and serializes them
+both ways the API can: the response_model path (pydantic orm_mode
+validation, jsonable_encoder, stdlib json) and the serializers.py +
+orjson path used by the task and project routes. Checks that both give
+the same JSON and reports the median time per list.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/serialization.py [--tasks 1000] [--projects 50] [--repeat 20]
+
+By default a temporary SQLite database is used; set DATABASE_URL to run it
+against another (migrated, empty) database.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from common import migrate, use_scratch_database
+
+use_scratch_database("serialization")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import crud, models, schemas
+from app.database import SessionLocal
+from app.serializers import serialize_projects, serialize_tasks
+
+
+def seed(db, projects, tasks_per_project):
+    user = models.User(email="serialize@example.com", username="serialize", hashed_password="x", full_name="S")
+    db.add(user)
+    db.flush()
+    tags = [models.Tag(name=f"tag-{i}") for i in range(10)]
+    db.add_all(tags)
+    now = datetime.now()
+    for p in range(projects):
+        project = models.Project(
+            name=f"Project {p}", description="Benchmark project", category="bench", user_id=user.id,
+            start_date=now, end_date=now + timedelta(days=90),
+        )
+        project.team = [user]
+        db.add(project)
+        for t in range(tasks_per_project):
+            task = models.Task(
+                title=f"Task {p}-{t}", description="Benchmark task " * 4, project=project,
+                due_date=now + timedelta(days=t % 30), assignee_id=user.id,
+                priority=list(models.Priority)[t % 4], status=list(models.TaskStatus)[t % 4],
+            )
+            task.tags = [tags[t % 10], tags[(t + 3) % 10]]
+            task.comments = [models.Comment(content=f"Comment {c}", user_id=user.id) for c in range(2)]
+            db.add(task)
+    db.commit()
+    return user.id
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - start)
+    return body, statistics.median(samples)
+
+
+def compare(label, items, response_type, fast, repeat):
+    field = create_response_field(name=f"Response_{label}", type_=response_type)
+
+    def pydantic_path():
+        content = asyncio.run(serialize_response(field=field, response_content=items))
+        return JSONResponse(content).body
+
+    def orjson_path():
+        return ORJSONResponse(fast(items)).body
+
+    slow_body, slow = timed(pydantic_path, repeat)
+    fast_body, quick = timed(orjson_path, repeat)
+    assert json.loads(slow_body) == json.loads(fast_body), f"{label}: responses differ"
+    print(
+        f"{label:<24} response_model {slow * 1000:8.1f} ms   serializers+orjson {quick * 1000:7.1f} ms"
+        f"   x{slow / quick:5.1f}   {len(fast_body) / 1024:7.0f} KiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    migrate()
+    db = SessionLocal()
+    user_id = seed(db, args.projects, max(1, args.tasks // args.projects))
+
+    tasks = crud.get_tasks(db, user_id=user_id, limit=args.tasks)
+    projects = crud.get_projects(db, user_id=user_id, limit=args.projects)
+    compare(f"{len(tasks)} tasks", tasks, List[schemas.Task], serialize_tasks, args.repeat)
+    compare(f"{len(projects)} projects", projects, List[schemas.Project], serialize_projects, args.repeat)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
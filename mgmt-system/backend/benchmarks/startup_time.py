@@ -0,0 +1,92 @@
+"""
+Startup time benchmark
+----------------------
+
+Times, in fresh interpreters, what a new worker pays before it can serve:
+importing the application, and the first use of the AI features (loading
+the AI modules and their LLM client). Reports the median and best of
+several runs, and optionally the slowest imports behind `import app.main`.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/startup_time.py [--runs 5] [--top 10]
+
+The AI timings are taken with and without an OPENAI_API_KEY; only client
+construction is timed, no request is sent to OpenAI.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from common import BACKEND_DIR
+
+BOOT = """
+import time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+"""
+
+AI_FIRST_USE = """
+import time
+import app.main
+start = time.perf_counter()
+from app.ai import schedule_optimizer, task_suggestions
+from app.ai.llm import get_llm
+for module in (task_suggestions, schedule_optimizer):
+    get_llm(module.LLM_TEMPERATURE)
+print(time.perf_counter() - start)
+"""
+
+IMPORT_TIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def run(snippet, env):
+    result = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure(label, snippet, runs, **overrides):
+    env = {**os.environ, **overrides}
+    samples = [run(snippet, env) for _ in range(runs)]
+    print(f"{label:<28} median {statistics.median(samples) * 1000:7.0f} ms   best {min(samples) * 1000:7.0f} ms")
+
+
+def slowest_imports(top):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    # Direct imports of app.main, by cumulative time
+    imports = [
+        (int(m.group(1)), m.group(3))
+        for m in map(IMPORT_TIME.match, result.stderr.splitlines())
+        if m and len(m.group(2)) == 3
+    ]
+    print("\nSlowest imports under app.main:")
+    for micros, name in sorted(imports, reverse=True)[:top]:
+        print(f"  {micros / 1000:7.0f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports")
+    args = parser.parse_args()
+
+    measure("boot (import app.main)", BOOT, args.runs)
+    measure("first AI use, no API key", AI_FIRST_USE, args.runs, OPENAI_API_KEY="")
+    measure("first AI use, API key set", AI_FIRST_USE, args.runs, OPENAI_API_KEY="sk-startup-benchmark")
+    if args.top:
+        slowest_imports(args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Task filter benchmark
+---------------------
+
+Seeds one user with a large number of tasks (inserted in bulk through
+SQLAlchemy Core, with tags, assignees, priorities and due dates spread over
+a year), starts the API under uvicorn and times the views built on the
+filters of GET /api/tasks/: a calendar month ("month"), "my overdue urgent
+tasks" ("overdue") and any-of / all-of tag boards. They are compared with
+what the client did before the filters existed: page through every task
+by cursor and filter locally. Reports latency and rows fetched for each.
+
+Usage (from mgmt-system/backend):
+
+    python benchmarks/task_filters.py [--tasks 100000] [--projects 50] [--requests 50] [--async-db]
+
+By default a temporary SQLite database is used; set DATABASE_URL to
+benchmark another (migrated, empty) database.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import BACKEND_DIR, latency_line, migrate, use_scratch_database
+
+use_scratch_database("task_filters")
+
+import httpx
+from sqlalchemy import insert, select
+
+from app import models
+from app.database import engine
+
+PASSWORD = "bench-password"
+PORT = 8770
+PAGE_SIZE = 1000
+TAGS = 20
+
+
+def seed(user_id, tasks, projects):
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Tag), [{"name": f"filter-tag-{i}"} for i in range(TAGS)])
+        tag_ids = conn.execute(select(models.Tag.id).order_by(models.Tag.id)).scalars().all()
+        conn.execute(insert(models.Project), [
+            {"name": f"Project {p}", "category": "bench", "user_id": user_id,
+             "start_date": now, "end_date": now + timedelta(days=365)}
+            for p in range(projects)
+        ])
+        project_ids = conn.execute(
+            select(models.Project.id).where(models.Project.user_id == user_id).order_by(models.Project.id)
+        ).scalars().all()
+
+    statuses, priorities = list(models.TaskStatus), list(models.Priority)
+    chunk = 20000
+    for start in range(0, tasks, chunk):
+        with engine.begin() as conn:
+            first_id = conn.execute(select(models.Task.id).order_by(models.Task.id.desc()).limit(1)).scalar() or 0
+            rows = [
+                {"title": f"Task {i}", "project_id": project_ids[i % len(project_ids)],
+                 "status": statuses[i % 4], "priority": priorities[(i // 4) % 4],
+                 "due_date": now + timedelta(hours=(i * 37) % (365 * 24) - 180 * 24),
+                 "assignee_id": user_id if i % 3 == 0 else None, "created_at": now}
+                for i in range(start, min(start + chunk, tasks))
+            ]
+            conn.execute(insert(models.Task), rows)
+            conn.execute(insert(models.task_tags), [
+                {"task_id": first_id + 1 + n, "tag_id": tag_ids[(first_id + n + k * 7) % len(tag_ids)]}
+                for n in range(len(rows)) for k in range(2)
+            ])
+        print(f"\rseeded {min(start + chunk, tasks)} tasks", end="", flush=True)
+    print()
+
+
+def start_server(async_db):
+    env = dict(os.environ, ASYNC_DB="true" if async_db else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+async def wait_until_up(client):
+    for _ in range(100):
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+async def login(client):
+    await client.post("/api/auth/register", json={
+        "email": "filters@example.com", "username": "filters", "password": PASSWORD,
+    })
+    response = await client.post("/api/auth/token", data={"username": "filters", "password": PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def fetch_all(client, headers, params):
+    """Every page of GET /api/tasks/ for `params`, following X-Next-Cursor."""
+    tasks, params = [], dict(params, limit=PAGE_SIZE)
+    while True:
+        response = await client.get("/api/tasks/", params=params, headers=headers)
+        response.raise_for_status()
+        tasks += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return tasks
+        params["cursor"] = cursor
+
+
+def views(user_id):
+    now = datetime.now()
+    month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    next_month = (month + timedelta(days=32)).replace(day=1)
+    # Each task has tags i and i + 7 (mod TAGS)
+    any_of, all_of = ["filter-tag-0", "filter-tag-1", "filter-tag-2"], ["filter-tag-0", "filter-tag-7"]
+
+    def due(task):
+        return datetime.fromisoformat(task["due_date"])
+
+    def tag_names(task):
+        return {tag["name"] for tag in task["tags"]}
+
+    return {
+        "month": (
+            {"due_from": month.isoformat(), "due_before": next_month.isoformat(), "sort": "due_date"},
+            lambda task: month <= due(task) < next_month,
+        ),
+        "overdue": (
+            {"assignee_id": user_id, "due_before": now.isoformat(), "priority": "urgent",
+             "status": "todo,in-progress,review"},
+            lambda task: task["assignee_id"] == user_id and due(task) < now
+            and task["priority"] == "urgent" and task["status"] != "done",
+        ),
+        "any tags": ({"tags": ",".join(any_of)}, lambda task: bool(tag_names(task) & set(any_of))),
+        "all tags": ({"tags_all": ",".join(all_of)}, lambda task: set(all_of) <= tag_names(task)),
+    }
+
+
+async def run(args):
+    server = start_server(args.async_db)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=None) as client:
+            await wait_until_up(client)
+            headers = await login(client)
+            me = await client.get("/api/auth/me", headers=headers)
+            user_id = me.json()["id"]
+            seed(user_id, args.tasks, args.projects)
+
+            start = time.perf_counter()
+            everything = await fetch_all(client, headers, {})
+            download = time.perf_counter() - start
+            print(f"client-side: {len(everything)} tasks downloaded in {download * 1000:.0f} ms, then filtered")
+
+            for label, (params, matches) in views(user_id).items():
+                samples = []
+                for _ in range(args.requests):
+                    start = time.perf_counter()
+                    tasks = await fetch_all(client, headers, params)
+                    samples.append(time.perf_counter() - start)
+                expected = sum(1 for task in everything if matches(task))
+                assert len(tasks) == expected, (label, len(tasks), expected)
+                print(f"{latency_line(label, samples)}   {len(tasks):6d} rows")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--tasks", type=int, default=100000, help="tasks to seed")
+    parser.add_argument("--projects", type=int, default=50, help="projects to spread them over")
+    parser.add_argument("--requests", type=int, default=50, help="requests per view")
+    parser.add_argument("--async-db", action="store_true", help="run the server with ASYNC_DB=true")
+    args = parser.parse_args()
+
+    migrate()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
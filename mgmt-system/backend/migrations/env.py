@@ -0,0 +1,72 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app import models  # noqa: F401 - registers every table on Base.metadata
+from app.database import Base, engine
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# SQLite cannot ALTER most constraints in place, so autogenerated
+# migrations use batch mode (copy-and-move) there
+render_as_batch = engine.dialect.name == "sqlite"
+
+
+# The full-text index of migration 0005 is not in the models: the FTS5
+# search_index table (and its shadow tables) on SQLite, the search_vector
+# columns and their GIN indexes on PostgreSQL. Keep autogenerate from
+# dropping it. A batch migration of tasks, projects or comments drops their
+# search_index triggers on SQLite; recreate them from 0005 after it.
+def include_object(obj, name, type_, reflected, compare_to):
+    if reflected and compare_to is None and name:
+        return not (name.startswith("search_") or name.endswith("_search_vector"))
+    return True
+
+
+def run_migrations_offline():
+    """Emit the migration SQL to stdout instead of running it."""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=render_as_batch,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations against the application's engine."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
+    with engine.connect() as connection:
+        _run_with_connection(connection)
+
+
+def _run_with_connection(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=render_as_batch,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
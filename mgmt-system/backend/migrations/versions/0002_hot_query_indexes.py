@@ -0,0 +1,61 @@
+"""hot query indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 05:02:41.516307
+
+Composite indexes for the filters used by crud.get_tasks, get_project_stats,
+get_task_completion_stats and update_project_completion, the (sort key, id)
+indexes behind keyset pagination, and indexes on the reverse side of the
+association tables and child collections.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# Must render exactly like models.priority_rank() for SQLite to match it
+def priority_rank():
+    whens = " ".join(
+        f"WHEN (priority = '{name}') THEN {rank}"
+        for rank, name in enumerate(('LOW', 'MEDIUM', 'HIGH', 'URGENT'))
+    )
+    return sa.text(f"(CASE {whens} END)")
+
+
+INDEXES = [
+    ('ix_projects_user_id_status', 'projects', ['user_id', 'status']),
+    ('ix_projects_end_date_id', 'projects', ['end_date', 'id']),
+    ('ix_projects_updated_at_id', 'projects', ['updated_at', 'id']),
+    ('ix_projects_priority_rank_id', 'projects', [priority_rank(), 'id']),
+    ('ix_tasks_project_id_status_due_date', 'tasks', ['project_id', 'status', 'due_date']),
+    ('ix_tasks_project_id_status_updated_at', 'tasks', ['project_id', 'status', 'updated_at']),
+    ('ix_tasks_assignee_id', 'tasks', ['assignee_id']),
+    ('ix_tasks_due_date_id', 'tasks', ['due_date', 'id']),
+    ('ix_tasks_updated_at_id', 'tasks', ['updated_at', 'id']),
+    ('ix_tasks_priority_rank_id', 'tasks', [priority_rank(), 'id']),
+    ('ix_task_tags_tag_id_task_id', 'task_tags', ['tag_id', 'task_id']),
+    ('ix_project_team_members_user_id_project_id', 'project_team_members', ['user_id', 'project_id']),
+    ('ix_comments_task_id', 'comments', ['task_id']),
+    ('ix_attachments_task_id', 'attachments', ['task_id']),
+    ('ix_logs_user_id_created_at', 'logs', ['user_id', 'created_at']),
+    ('ix_logs_project_id', 'logs', ['project_id']),
+    ('ix_logs_task_id', 'logs', ['task_id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
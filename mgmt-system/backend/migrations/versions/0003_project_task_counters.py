@@ -0,0 +1,46 @@
+"""project task counters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 05:41:09.802113
+
+Adds Project.total_tasks / done_tasks, maintained incrementally by the task
+writes in crud.py, and backfills them (and completion_percentage) from the
+tasks table.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('total_tasks', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('projects', sa.Column('done_tasks', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        """
+        UPDATE projects SET
+            total_tasks = (SELECT COUNT(*) FROM tasks WHERE tasks.project_id = projects.id),
+            done_tasks = (SELECT COUNT(*) FROM tasks WHERE tasks.project_id = projects.id AND tasks.status = 'DONE')
+        """
+    )
+    op.execute(
+        """
+        UPDATE projects SET completion_percentage =
+            CASE WHEN total_tasks > 0 THEN done_tasks * 100.0 / total_tasks ELSE 0 END
+        """
+    )
+
+
+def downgrade():
+    # Plain DROP COLUMN (SQLite 3.35+): batch mode would rebuild the table
+    # and lose the expression index on priority, which SQLite cannot reflect
+    op.drop_column('projects', 'done_tasks')
+    op.drop_column('projects', 'total_tasks')
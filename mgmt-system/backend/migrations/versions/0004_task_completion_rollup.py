@@ -0,0 +1,68 @@
+"""task completion rollup
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 07:12:44.518306
+
+Adds Task.completed_at and the task_completion_daily rollup read by the
+task completion analytics. Existing DONE tasks get their last update time
+as completion time (the best record there is), and the rollup is filled
+from them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    op.execute(
+        """
+        UPDATE tasks SET completed_at = COALESCE(updated_at, created_at)
+        WHERE status = 'DONE' AND completed_at IS NULL
+        """
+    )
+
+    # The priority enum type already exists on PostgreSQL (tasks.priority)
+    priority = sa.Enum('LOW', 'MEDIUM', 'HIGH', 'URGENT', name='priority')
+    if op.get_bind().dialect.name == 'postgresql':
+        priority = postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', 'URGENT', name='priority', create_type=False)
+
+    op.create_table('task_completion_daily',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('priority', priority, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('completed', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'project_id', 'priority', 'day')
+    )
+    op.create_index('ix_task_completion_daily_user_id_day', 'task_completion_daily', ['user_id', 'day'], unique=False)
+
+    # CAST(... AS DATE) has numeric affinity on SQLite and yields the year
+    day = 'date(tasks.completed_at)' if op.get_bind().dialect.name == 'sqlite' else 'CAST(tasks.completed_at AS DATE)'
+    op.execute(
+        f"""
+        INSERT INTO task_completion_daily (user_id, project_id, priority, day, completed)
+        SELECT projects.user_id, tasks.project_id, COALESCE(tasks.priority, 'MEDIUM'), {day}, COUNT(*)
+        FROM tasks JOIN projects ON projects.id = tasks.project_id
+        WHERE tasks.status = 'DONE' AND tasks.completed_at IS NOT NULL AND projects.user_id IS NOT NULL
+        GROUP BY projects.user_id, tasks.project_id, COALESCE(tasks.priority, 'MEDIUM'), {day}
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('ix_task_completion_daily_user_id_day', table_name='task_completion_daily')
+    op.drop_table('task_completion_daily')
+    # Plain DROP COLUMN, see 0003
+    op.drop_column('tasks', 'completed_at')
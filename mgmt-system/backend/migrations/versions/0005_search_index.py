@@ -0,0 +1,168 @@
+"""search index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 09:03:27.114902
+
+Full-text index over task titles and descriptions, project names and
+descriptions, and comments, read by crud.search_documents (see app/search.py).
+
+PostgreSQL: a generated tsvector column with a GIN index on each table,
+kept current by the database itself.
+
+SQLite: one FTS5 table, search_index, kept in sync by the triggers below.
+Its rowid is id * 4 + kind (1 task, 2 project, 3 comment) and its owner
+column holds "u<user id>" of the owning project's user, so a search is
+scoped to one user inside the index.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+POSTGRES_VECTORS = {
+    'tasks': "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+             "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+    'projects': "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+    'comments': "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+}
+
+# Index rows for the tasks, projects and comments matching a condition
+SQLITE_TASK_ROWS = """
+    SELECT tasks.id * 4 + 1, 'u' || projects.user_id, tasks.title, tasks.description
+    FROM tasks JOIN projects ON projects.id = tasks.project_id
+"""
+SQLITE_PROJECT_ROWS = """
+    SELECT projects.id * 4 + 2, 'u' || projects.user_id, projects.name, projects.description
+    FROM projects
+"""
+SQLITE_COMMENT_ROWS = """
+    SELECT comments.id * 4 + 3, 'u' || projects.user_id, NULL, comments.content
+    FROM comments JOIN tasks ON tasks.id = comments.task_id JOIN projects ON projects.id = tasks.project_id
+"""
+SQLITE_INSERT = "INSERT INTO search_index (rowid, owner, title, body)"
+
+SQLITE_TRIGGERS = {
+    'search_index_task_insert': f"""
+        AFTER INSERT ON tasks BEGIN
+            {SQLITE_INSERT} {SQLITE_TASK_ROWS} WHERE tasks.id = NEW.id;
+        END
+    """,
+    'search_index_task_update': f"""
+        AFTER UPDATE OF title, description, project_id ON tasks
+        WHEN NEW.title IS NOT OLD.title OR NEW.description IS NOT OLD.description
+            OR NEW.project_id IS NOT OLD.project_id
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 4 + 1;
+            {SQLITE_INSERT} {SQLITE_TASK_ROWS} WHERE tasks.id = NEW.id;
+        END
+    """,
+    # A task moved to another user's project takes its comments along
+    'search_index_task_move': """
+        AFTER UPDATE OF project_id ON tasks
+        WHEN NEW.project_id IS NOT OLD.project_id
+        BEGIN
+            UPDATE search_index SET owner = (SELECT 'u' || user_id FROM projects WHERE id = NEW.project_id)
+            WHERE rowid IN (SELECT id * 4 + 3 FROM comments WHERE task_id = NEW.id);
+        END
+    """,
+    'search_index_task_delete': """
+        AFTER DELETE ON tasks BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 4 + 1;
+        END
+    """,
+    'search_index_project_insert': f"""
+        AFTER INSERT ON projects BEGIN
+            {SQLITE_INSERT} {SQLITE_PROJECT_ROWS} WHERE projects.id = NEW.id;
+        END
+    """,
+    'search_index_project_update': f"""
+        AFTER UPDATE OF name, description, user_id ON projects
+        WHEN NEW.name IS NOT OLD.name OR NEW.description IS NOT OLD.description
+            OR NEW.user_id IS NOT OLD.user_id
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 4 + 2;
+            {SQLITE_INSERT} {SQLITE_PROJECT_ROWS} WHERE projects.id = NEW.id;
+        END
+    """,
+    'search_index_project_owner': """
+        AFTER UPDATE OF user_id ON projects
+        WHEN NEW.user_id IS NOT OLD.user_id
+        BEGIN
+            UPDATE search_index SET owner = 'u' || NEW.user_id
+            WHERE rowid IN (
+                SELECT id * 4 + 1 FROM tasks WHERE project_id = NEW.id
+                UNION ALL
+                SELECT comments.id * 4 + 3 FROM comments JOIN tasks ON tasks.id = comments.task_id
+                WHERE tasks.project_id = NEW.id
+            );
+        END
+    """,
+    'search_index_project_delete': """
+        AFTER DELETE ON projects BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 4 + 2;
+        END
+    """,
+    'search_index_comment_insert': f"""
+        AFTER INSERT ON comments BEGIN
+            {SQLITE_INSERT} {SQLITE_COMMENT_ROWS} WHERE comments.id = NEW.id;
+        END
+    """,
+    'search_index_comment_update': f"""
+        AFTER UPDATE OF content, task_id ON comments
+        WHEN NEW.content IS NOT OLD.content OR NEW.task_id IS NOT OLD.task_id
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 4 + 3;
+            {SQLITE_INSERT} {SQLITE_COMMENT_ROWS} WHERE comments.id = NEW.id;
+        END
+    """,
+    'search_index_comment_delete': """
+        AFTER DELETE ON comments BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 4 + 3;
+        END
+    """,
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, vector in POSTGRES_VECTORS.items():
+            op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED")
+            op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+        return
+
+    # Porter stemming to match the 'english' configuration used on PostgreSQL,
+    # prefix indexes for the type-ahead prefix on the last search term
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE search_index USING fts5(
+            owner, title, body,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """
+    )
+    for rows in (SQLITE_TASK_ROWS, SQLITE_PROJECT_ROWS, SQLITE_COMMENT_ROWS):
+        op.execute(f"{SQLITE_INSERT} {rows}")
+    for name, body in SQLITE_TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in POSTGRES_VECTORS:
+            op.drop_index(f'ix_{table}_search_vector', table_name=table)
+            op.drop_column(table, 'search_vector')
+        return
+
+    for name in SQLITE_TRIGGERS:
+        op.execute(f"DROP TRIGGER {name}")
+    op.execute("DROP TABLE search_index")
@@ -0,0 +1,34 @@
+"""task filter indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 11:42:08.356217
+
+Indexes for the due-date range filters of crud.task_filter_conditions:
+(project_id, due_date) for date ranges over a user's projects, such as a
+calendar month, and (assignee_id, due_date) for one assignee's tasks due
+in a range, such as their overdue tasks. The latter replaces the plain
+assignee_id index, which is its prefix.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tasks_project_id_due_date', 'tasks', ['project_id', 'due_date'], unique=False)
+    op.create_index('ix_tasks_assignee_id_due_date', 'tasks', ['assignee_id', 'due_date'], unique=False)
+    op.drop_index('ix_tasks_assignee_id', table_name='tasks')
+
+
+def downgrade():
+    op.create_index('ix_tasks_assignee_id', 'tasks', ['assignee_id'], unique=False)
+    op.drop_index('ix_tasks_assignee_id_due_date', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_due_date', table_name='tasks')
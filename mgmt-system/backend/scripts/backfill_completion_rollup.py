@@ -0,0 +1,41 @@
+"""
+Completion rollup backfill
+--------------------------
+
+Rebuilds the task_completion_daily rollup from the completed tasks in the
+tasks table. Run it after importing data behind the application's back or
+whenever the analytics look off.
+
+Usage (from mgmt-system/backend):
+
+    python scripts/backfill_completion_rollup.py            # rebuild for every user
+    python scripts/backfill_completion_rollup.py --user 42  # rebuild for one user
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import crud
+from app.database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--user", type=int, help="only rebuild the rollup of this user id")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = crud.rebuild_completion_rollup(db, user_id=args.user)
+    finally:
+        db.close()
+
+    print(f"{rows} rollup row(s) written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
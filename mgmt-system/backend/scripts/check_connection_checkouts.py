@@ -0,0 +1,61 @@
+"""
+Connection checkout check
+-------------------------
+
+Migrates a scratch database to head and runs the requests of
+tests/test_connection_checkouts.py against it, printing how many pooled
+connections each request held at once. Exits non-zero if one held more
+than one. The same check runs in the test suite (python -m pytest); this
+script also reports the per-request peaks and honors ASYNC_DB.
+
+Usage (from mgmt-system/backend):
+
+    python scripts/check_connection_checkouts.py
+
+By default a temporary SQLite database is used; set DATABASE_URL to check
+against another empty scratch database.
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+if not os.getenv("DATABASE_URL"):
+    scratch = os.path.join(tempfile.mkdtemp(), "connection_checkouts.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch}"
+
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.test_connection_checkouts import request_peaks
+
+
+def migrate():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+def main():
+    migrate()
+
+    failures = 0
+    for method, path, status, peak in request_peaks(TestClient(app)):
+        ok = status == 200 and peak <= 1
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<4} {method} {path}: {status}, peak {peak} connection(s)")
+
+    if failures:
+        print(f"{failures} request(s) held more than one connection at once")
+        return 1
+    print("Every request used a single connection")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Query plan check
+----------------
+
+Migrates a scratch database to head, runs the hot read paths of crud.py
+against it and EXPLAINs every statement they emit. Exits non-zero if any
+statement has to scan a whole table instead of using an index.
+
+Usage (from mgmt-system/backend):
+
+    python scripts/check_query_plans.py
+
+By default a temporary SQLite database is used. Point DATABASE_URL at an
+empty scratch database to check PostgreSQL plans; sequential scans are
+disabled there while explaining, so tiny tables still report the index
+the planner would pick once they grow.
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+if not os.getenv("DATABASE_URL"):
+    scratch = os.path.join(tempfile.mkdtemp(), "query_plans.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch}"
+
+from datetime import datetime, timedelta
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+
+from app import crud, models, schemas
+from app.database import SessionLocal, engine
+from app.pagination import encode_cursor
+
+# Tables whose full scans grow with user data
+HOT_TABLES = {
+    "projects", "tasks", "task_tags", "project_team_members",
+    "comments", "attachments", "logs", "tags",
+}
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def migrate():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+def seed(db):
+    user = models.User(email="plans@example.com", username="plans", hashed_password="x")
+    db.add(user)
+    db.flush()
+    project = models.Project(
+        name="Plans", category="check", user_id=user.id,
+        start_date=datetime.now(), end_date=datetime.now() + timedelta(days=30),
+    )
+    db.add(project)
+    db.flush()
+    task = models.Task(title="Plans", project_id=project.id, due_date=datetime.now())
+    db.add(task)
+    db.commit()
+    return user.id, project.id, task.id
+
+
+def hot_queries(db, user_id, project_id, task_id):
+    """The read paths whose plans are checked, by name."""
+    return {
+        "get_tasks": lambda: crud.get_tasks(db, user_id=user_id),
+        "get_tasks(project, status)": lambda: crud.get_tasks(
+            db, user_id=user_id, project_id=project_id, status=models.TaskStatus.DONE
+        ),
+        "get_tasks(sort=-due_date)": lambda: crud.get_tasks(db, user_id=user_id, sort="-due_date"),
+        "get_tasks(calendar month)": lambda: crud.get_tasks(
+            db, user_id=user_id, sort="due_date",
+            due_from=datetime(2026, 10, 1), due_before=datetime(2026, 11, 1),
+        ),
+        "get_tasks(overdue urgent)": lambda: crud.get_tasks(
+            db, user_id=user_id, assignee_id=user_id, due_before=datetime.now(),
+            priority=[models.Priority.URGENT], status=[models.TaskStatus.TODO, models.TaskStatus.IN_PROGRESS],
+        ),
+        "get_tasks(tags, tags_all)": lambda: crud.get_tasks(
+            db, user_id=user_id, tags=["plans", "other"], tags_all=["plans", "other"],
+        ),
+        "get_task_for_user": lambda: crud.get_task_for_user(db, task_id, user_id),
+        "get_projects": lambda: crud.get_projects(db, user_id=user_id),
+        "get_project_for_user": lambda: crud.get_project_for_user(db, project_id, user_id),
+        "user_owns_project": lambda: crud.user_owns_project(db, project_id, user_id),
+        "get_project_stats": lambda: crud.get_project_stats(db, user_id=user_id),
+        "get_task_completion_stats": lambda: crud.get_task_completion_stats(db, user_id=user_id),
+        "task_fingerprint": lambda: crud.task_fingerprint(db, user_id),
+        "task_fingerprint(task)": lambda: crud.task_fingerprint(db, user_id, task_id=task_id),
+        "task_fingerprint(project, status)": lambda: crud.task_fingerprint(
+            db, user_id, project_id=project_id, status=models.TaskStatus.DONE
+        ),
+        "project_fingerprint": lambda: crud.project_fingerprint(db, user_id),
+        "project_fingerprint(project)": lambda: crud.project_fingerprint(db, user_id, project_id=project_id),
+        "recount_project_counters": lambda: crud.recount_project_counters(db, [project_id], dry_run=True),
+        "task_export_statement": lambda: db.execute(
+            crud.task_export_statement(user_id, engine.dialect.name)
+        ).all(),
+        "project_export_statement": lambda: db.execute(
+            crud.project_export_statement(user_id, engine.dialect.name)
+        ).all(),
+        "search_documents": lambda: crud.search_documents(db, user_id, "plans"),
+        "search_documents(cursor)": lambda: crud.search_documents(
+            db, user_id, "pla", cursor=encode_cursor("search", 1.0, task_id * 4 + 1)
+        ),
+        # Last, as it inserts a task
+        "import_tasks": lambda: crud.import_tasks(db, user_id, [
+            schemas.TaskImportRow(title="Import", project_name="Plans", due_date=datetime.now(),
+                                  assignee_username="plans", tags=["plans"]),
+            schemas.TaskImportRow(title="Import", project_id=project_id, due_date=datetime.now(),
+                                  assignee_email="plans@example.com"),
+        ]),
+    }
+
+
+def explain(statement, parameters):
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if engine.dialect.name == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            plan = [row[-1] for row in cursor.fetchall()]
+            scans = [m.group(1) for m in map(SQLITE_FULL_SCAN.match, plan) if m]
+        else:
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plan = [row[0] for row in cursor.fetchall()]
+            scans = [m.group(1) for line in plan for m in POSTGRES_FULL_SCAN.finditer(line)]
+        return plan, [table for table in scans if table in HOT_TABLES]
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def main():
+    migrate()
+
+    db = SessionLocal()
+    user_id, project_id, task_id = seed(db)
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    failures = 0
+    for name, run in hot_queries(db, user_id, project_id, task_id).items():
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            run()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        failed = 0
+        for statement, parameters in captured:
+            plan, full_scans = explain(statement, parameters)
+            if full_scans:
+                failed += 1
+                print(f"FAIL {name}: full scan of {', '.join(full_scans)}")
+                print("     " + " ".join(statement.split()))
+                for line in plan:
+                    print(f"       {line}")
+        if not failed:
+            print(f"ok   {name} ({len(captured)} statements)")
+        failures += failed
+
+    db.close()
+    if failures:
+        print(f"{failures} statement(s) scan a hot table without an index")
+        return 1
+    print("All hot queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Project counter repair
+----------------------
+
+Recomputes Project.total_tasks / done_tasks (and completion_percentage)
+from the tasks table and reports every project whose stored counters had
+drifted.
+
+Usage (from mgmt-system/backend):
+
+    python scripts/repair_project_counters.py           # fix drifted counters
+    python scripts/repair_project_counters.py --check   # report only, exit 1 on drift
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import crud
+from app.database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--check", action="store_true", help="only report drift, do not fix it")
+    parser.add_argument("--project", type=int, action="append", help="limit to this project id (repeatable)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drifted = crud.recount_project_counters(db, project_ids=args.project, dry_run=args.check)
+    finally:
+        db.close()
+
+    for row in drifted:
+        print(
+            f"project {row['project_id']}: "
+            f"total {row['total_tasks']} -> {row['actual_total']}, "
+            f"done {row['done_tasks']} -> {row['actual_done']}"
+        )
+
+    action = "found" if args.check else "repaired"
+    print(f"{len(drifted)} project(s) with drifted counters {action}")
+    return 1 if args.check and drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Test fixtures
+-------------
+
+The tests run the API in process against a scratch SQLite database migrated
+to head. The engine reads DATABASE_URL at import time, so it is set here,
+before anything from `app` is imported. Set TEST_DATABASE_URL to run them
+against another empty scratch database instead; DATABASE_URL itself is
+never reused, so the tests cannot write to a real database by accident.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.db')}"
+)
+
+
+def migrate():
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture(scope="session")
+def database():
+    """app.database, once the scratch database is migrated."""
+    migrate()
+    from app import database
+
+    return database
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
@@ -0,0 +1,78 @@
+"""
+Authentication and the handler share one request-scoped session, so no
+request may hold more than one pooled connection at a time. (A session that
+commits and then reads again checks its connection back in and out; that is
+still one.) The token cache is cleared before every request, so
+authentication always goes to the database too.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import crud, database
+
+
+def request_peaks(client):
+    """Drive the authenticated endpoints through `client`.
+
+    Returns (method, path, status code, peak connections held) per request.
+    """
+    held = {"now": 0, "peak": 0}
+
+    def checkout(*args):
+        held["now"] += 1
+        held["peak"] = max(held["peak"], held["now"])
+
+    def checkin(*args):
+        held["now"] -= 1
+
+    client.post("/api/auth/register", json={
+        "email": "checkouts@example.com", "username": "checkouts", "password": "checkouts",
+    })
+    token = client.post("/api/auth/token", data={"username": "checkouts", "password": "checkouts"})
+    headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+    now = datetime.now()
+    project = client.post("/api/projects/", headers=headers, json={
+        "name": "Checkouts", "category": "check",
+        "start_date": now.isoformat(), "end_date": (now + timedelta(days=30)).isoformat(),
+    }).json()
+    task = {"title": "Checkouts", "project_id": project["id"], "due_date": now.isoformat()}
+    task_id = client.post("/api/tasks/", headers=headers, json=task).json()["id"]
+
+    requests = [
+        ("GET", "/api/auth/me", None),
+        ("GET", "/api/projects/", None),
+        ("GET", f"/api/projects/{project['id']}", None),
+        ("GET", "/api/projects/summary", None),
+        ("POST", "/api/tasks/", task),
+        ("GET", "/api/tasks/", None),
+        ("GET", f"/api/tasks/{task_id}", None),
+        ("PUT", f"/api/tasks/{task_id}", {"status": "done"}),
+        ("POST", "/api/tasks/batch", {"update": [{"id": task_id, "status": "review"}]}),
+        ("GET", "/api/analytics/project-stats", None),
+        ("GET", "/api/analytics/task-completion", None),
+    ]
+
+    engine = database.async_engine.sync_engine if database.ASYNC_DB else database.engine
+    event.listen(engine, "checkout", checkout)
+    event.listen(engine, "checkin", checkin)
+    peaks = []
+    try:
+        for method, path, body in requests:
+            crud.token_user_cache.clear()
+            held["peak"] = held["now"]
+            response = client.request(method, path, headers=headers, json=body)
+            peaks.append((method, path, response.status_code, held["peak"]))
+    finally:
+        event.remove(engine, "checkout", checkout)
+        event.remove(engine, "checkin", checkin)
+    return peaks
+
+
+def test_one_connection_checkout_per_request(client):
+    peaks = request_peaks(client)
+
+    assert [(method, path, status) for method, path, status, _ in peaks if status != 200] == []
+    assert [(method, path, peak) for method, path, _, peak in peaks if peak > 1] == []
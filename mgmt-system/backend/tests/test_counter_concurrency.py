@@ -0,0 +1,115 @@
+"""
+Project counters and the completion rollup are adjusted by deltas computed
+from each task's state before the write. Concurrent writes to the same
+tasks must not both apply a delta from the same old state: after many
+sessions race to update, batch-update and delete the same tasks, the
+counters must still match a recount and the rollup the DONE tasks.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app import crud, models, schemas
+
+SESSIONS = 8
+TASKS = 6
+
+
+def race(database, work):
+    """Run work(db, n) in SESSIONS threads, each with its own session, at once."""
+    barrier = threading.Barrier(SESSIONS)
+    errors = []
+
+    def run(n):
+        db = database.SessionLocal()
+        try:
+            barrier.wait()
+            work(db, n)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_parallel_task_writes_keep_counters(database):
+    db = database.SessionLocal()
+    try:
+        user_id = crud.create_user(db, schemas.UserCreate(
+            email="races@example.com", username="races", password="races",
+        )).id
+        now = datetime.now()
+        projects = [
+            crud.create_project(db, schemas.ProjectCreate(
+                name=f"Races {n}", category="check", start_date=now, end_date=now + timedelta(days=30),
+            ), user_id).id
+            for n in range(2)
+        ]
+        task_ids = [
+            crud.create_task(db, schemas.TaskCreate(
+                title=f"Race {n}", project_id=projects[0], due_date=now,
+            ), user_id).id
+            for n in range(TASKS)
+        ]
+    finally:
+        db.close()
+
+    def update(status, **fields):
+        def work(db, n):
+            for task_id in task_ids:
+                crud.update_task(db, task_id, schemas.TaskUpdate(status=status, **fields), user_id)
+        return work
+
+    def batch(status, **fields):
+        def work(db, n):
+            crud.apply_task_batch(db, user_id, schemas.TaskBatch(update=[
+                {"id": task_id, "status": status, **fields} for task_id in task_ids
+            ]))
+        return work
+
+    def remove(db, n):
+        crud.apply_task_batch(db, user_id, schemas.TaskBatch(delete=task_ids[:TASKS // 2]))
+        for task_id in task_ids[TASKS // 2:]:
+            crud.delete_task(db, task_id, user_id)
+
+    race(database, update("done"))
+    race(database, update("todo", project_id=projects[1]))
+    race(database, batch("done", priority="high"))
+    race(database, batch("review", project_id=projects[0]))
+    race(database, update("done"))
+
+    db = database.SessionLocal()
+    try:
+        assert crud.recount_project_counters(db, projects, dry_run=True) == []
+        done = db.scalar(
+            select(func.count(models.Task.id))
+            .where(models.Task.project_id.in_(projects), models.Task.status == models.TaskStatus.DONE)
+        )
+        rolled_up = db.scalar(
+            select(func.coalesce(func.sum(models.TaskCompletionDaily.completed), 0))
+            .where(models.TaskCompletionDaily.project_id.in_(projects))
+        )
+        assert (done, rolled_up) == (TASKS, TASKS)
+    finally:
+        db.close()
+
+    race(database, remove)
+
+    db = database.SessionLocal()
+    try:
+        assert crud.recount_project_counters(db, projects, dry_run=True) == []
+        rolled_up = db.scalar(
+            select(func.coalesce(func.sum(models.TaskCompletionDaily.completed), 0))
+            .where(models.TaskCompletionDaily.project_id.in_(projects))
+        )
+        assert rolled_up == 0
+    finally:
+        db.close()
@@ -0,0 +1,41 @@
+"""
+A batch update may leave project_id, status and priority out, but not set
+them to null: counters and the completion rollup follow those fields.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def task(client):
+    client.post("/api/auth/register", json={
+        "email": "batches@example.com", "username": "batches", "password": "batches",
+    })
+    token = client.post("/api/auth/token", data={"username": "batches", "password": "batches"})
+    headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+    now = datetime.now()
+    project = client.post("/api/projects/", headers=headers, json={
+        "name": "Batches", "category": "check",
+        "start_date": now.isoformat(), "end_date": (now + timedelta(days=30)).isoformat(),
+    }).json()
+    task = client.post("/api/tasks/", headers=headers, json={
+        "title": "Batches", "project_id": project["id"], "due_date": now.isoformat(), "status": "done",
+    }).json()
+    return headers, task
+
+
+@pytest.mark.parametrize("field", ["project_id", "status", "priority"])
+def test_batch_update_rejects_null(client, task, field):
+    headers, before = task
+    response = client.post("/api/tasks/batch", headers=headers, json={
+        "update": [{"id": before["id"], field: None}],
+    })
+    assert response.status_code == 422
+
+    after = client.get(f"/api/tasks/{before['id']}", headers=headers).json()
+    assert after[field] == before[field]
+    project = client.get(f"/api/projects/{before['project_id']}", headers=headers).json()
+    assert (project["total_tasks"], project["done_tasks"]) == (1, 1)